@@ -90,6 +90,8 @@ class AvatarPerformanceMonitor:
         # キャッシュ
         self.stats_cache: Dict[str, PerformanceStats] = {}
         self.active_operations: Dict[str, AvatarPerformanceMetrics] = {}
+        # タイムアウト済み（アラート送出済み）で保存待ちの操作。保存に失敗したら次回のチェックで再試行する
+        self.pending_timeouts: Dict[str, AvatarPerformanceMetrics] = {}
 
         # 監視設定
         self.alert_thresholds = {
@@ -185,32 +187,36 @@ class AvatarPerformanceMonitor:
     def _monitoring_loop(self):
         """監視ループ"""
         self.is_monitoring = True
+        # asyncio.run() は呼び出しごとにイベントループを生成・破棄するため、
+        # 監視スレッド専用のループを1つ作って使い回す
+        loop = asyncio.new_event_loop()
 
-        while self.is_monitoring:
-            try:
-                # アクティブな操作のタイムアウトチェック
-                self._check_operation_timeouts()
+        try:
+            while self.is_monitoring:
+                try:
+                    # アクティブな操作のタイムアウトチェック
+                    self._check_operation_timeouts()
 
-                # パフォーマンス統計更新
-                asyncio.run(self._update_performance_stats())
+                    # パフォーマンス統計更新
+                    loop.run_until_complete(self._update_performance_stats())
 
-                # アラートチェック
-                asyncio.run(self._check_alert_conditions())
+                    # アラートチェック
+                    loop.run_until_complete(self._check_alert_conditions())
 
-                # リソースクリーンアップ
-                self._cleanup_old_data()
+                    # リソースクリーンアップ
+                    self._cleanup_old_data()
 
-            except Exception as e:
-                logger.error(f"Monitoring loop error: {e}")
+                except Exception as e:
+                    logger.error(f"Monitoring loop error: {e}")
 
-            time.sleep(10)  # 10秒間隔
+                time.sleep(10)  # 10秒間隔
+        finally:
+            loop.close()
 
     def _check_operation_timeouts(self):
         """アクティブな操作のタイムアウトをチェック"""
         current_time = datetime.now(timezone.utc)
-        timeout_operations = []
-
-        for operation_id, metrics in self.active_operations.items():
+        for operation_id, metrics in list(self.active_operations.items()):
             elapsed = (current_time - metrics.start_time).total_seconds()
 
             max_duration = self.alert_thresholds["max_duration"].get(metrics.operation_type, 300.0)
@@ -221,7 +227,8 @@ class AvatarPerformanceMonitor:
                 metrics.end_time = current_time
                 metrics.duration = elapsed
 
-                timeout_operations.append(operation_id)
+                # アラートは1回だけ出し、以降は保存だけを再試行する
+                self.pending_timeouts[operation_id] = self.active_operations.pop(operation_id)
 
                 # アラート生成
                 alert = PerformanceAlert(
@@ -236,10 +243,24 @@ class AvatarPerformanceMonitor:
                 )
                 self.alert_queue.append(alert)
 
-        # タイムアウトした操作を完了としてマーク
-        for operation_id in timeout_operations:
-            completed_metrics = self.active_operations.pop(operation_id)
-            asyncio.run(self._save_performance_metrics(completed_metrics))
+        # タイムアウトした操作（前回保存できなかった分を含む）をまとめて1トランザクションで保存し、
+        # 保存できてから保存待ちから外す。実行中のイベントループがあっても動作するよう同期版で保存する
+        completed = list(self.pending_timeouts.items())
+        try:
+            self._write_performance_metrics(*(metrics for _, metrics in completed))
+        except sqlite3.IntegrityError:
+            # 同じ秒に開始した同種・同ユーザーの操作は行IDが衝突する。1件ずつ保存し直し、
+            # 衝突した操作以外の記録を巻き添えにしない
+            for operation_id, metrics in completed:
+                try:
+                    self._write_performance_metrics(metrics)
+                except sqlite3.IntegrityError as e:
+                    logger.error(f"Failed to save timed out operation {operation_id}: {e}")
+                self.pending_timeouts.pop(operation_id, None)
+            return
+
+        for operation_id, _ in completed:
+            self.pending_timeouts.pop(operation_id, None)
 
     async def _update_performance_stats(self):
         """パフォーマンス統計を更新"""
@@ -449,29 +470,40 @@ class AvatarPerformanceMonitor:
 
     async def _save_performance_metrics(self, metrics: AvatarPerformanceMetrics):
         """パフォーマンスメトリクスを保存"""
-        with sqlite3.connect(str(self.db_path)) as conn:
-            cursor = conn.cursor()
+        self._write_performance_metrics(metrics)
 
-            operation_id = f"{metrics.operation_type}_{metrics.user_id}_{int(metrics.start_time.timestamp())}"
+    def _write_performance_metrics(self, *metrics: AvatarPerformanceMetrics):
+        """パフォーマンスメトリクスを保存（同期版。監視スレッドからも直接呼び出せる）
 
-            cursor.execute('''
+        複数件はひとつの接続・トランザクションで executemany する。
+        """
+        if not metrics:
+            return
+
+        rows = [
+            (
+                f"{m.operation_type}_{m.user_id}_{int(m.start_time.timestamp())}",
+                m.operation_type,
+                m.user_id,
+                m.start_time.isoformat(),
+                m.end_time.isoformat() if m.end_time else None,
+                m.duration,
+                m.success,
+                m.error_message,
+                json.dumps(m.resource_usage, ensure_ascii=False),
+                json.dumps(m.quality_metrics, ensure_ascii=False),
+                json.dumps(m.metadata, ensure_ascii=False)
+            )
+            for m in metrics
+        ]
+
+        with sqlite3.connect(str(self.db_path)) as conn:
+            conn.executemany('''
                 INSERT INTO avatar_performance
                 (operation_id, operation_type, user_id, start_time, end_time, duration,
                  success, error_message, resource_usage, quality_metrics, metadata)
                 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                operation_id,
-                metrics.operation_type,
-                metrics.user_id,
-                metrics.start_time.isoformat(),
-                metrics.end_time.isoformat() if metrics.end_time else None,
-                metrics.duration,
-                metrics.success,
-                metrics.error_message,
-                json.dumps(metrics.resource_usage, ensure_ascii=False),
-                json.dumps(metrics.quality_metrics, ensure_ascii=False),
-                json.dumps(metrics.metadata, ensure_ascii=False)
-            ))
+            ''', rows)
 
             conn.commit()
 
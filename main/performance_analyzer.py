@@ -7,7 +7,7 @@ except ImportError:
 import logging
 import time
 from datetime import datetime, timezone
-from typing import Any, Dict
+from typing import Any, Dict, List, Tuple
 
 try:
     from logging_manager import Logger
@@ -22,9 +22,18 @@ class PerformanceError(Exception):
 class PerformanceAnalyzer:
     """Analyze system and application performance"""
 
-    def __init__(self, logger: Logger):
-        """Initialize performance analyzer"""
+    DEFAULT_HISTORY_LIMIT = 1000
+
+    def __init__(self, logger: Logger, history_limit: int = DEFAULT_HISTORY_LIMIT):
+        """Initialize performance analyzer
+
+        Args:
+            logger: ロガー
+            history_limit: メトリクス種別ごとに保持するサンプル数。2倍に達した時点で
+                直近 history_limit 件に切り詰める
+        """
         self.logger = logger
+        self.history_limit = max(1, int(history_limit))
         self.metrics = {
             'cpu': [],
             'memory': [],
@@ -32,6 +41,11 @@ class PerformanceAnalyzer:
             'network': []
         }
         self.running = False
+        # 論理 CPU 数は実行中に変わらないため初回収集時に一度だけ取得する
+        self._cpu_count = None
+        if PSUTIL_AVAILABLE:
+            # interval=None は前回呼び出しからの差分を返すため、基準点を作っておく
+            psutil.cpu_percent(interval=None)
 
     def start_monitoring(self, interval: int = 5) -> None:
         """Start performance monitoring"""
@@ -62,17 +76,19 @@ class PerformanceAnalyzer:
             timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
 
             # CPU metrics
-            cpu_percent = psutil.cpu_percent(interval=1)
-            cpu_count = psutil.cpu_count()
-            self.metrics['cpu'].append({
+            # interval=1 は収集のたびに1秒ブロックするため、前回呼び出しからの差分を使う
+            cpu_percent = psutil.cpu_percent(interval=None)
+            if self._cpu_count is None:
+                self._cpu_count = psutil.cpu_count()
+            self._append_sample('cpu', {
                 'timestamp': timestamp,
                 'percent': cpu_percent,
-                'count': cpu_count
+                'count': self._cpu_count
             })
 
             # Memory metrics
             memory = psutil.virtual_memory()
-            self.metrics['memory'].append({
+            self._append_sample('memory', {
                 'timestamp': timestamp,
                 'total': memory.total,
                 'used': memory.used,
@@ -81,7 +97,7 @@ class PerformanceAnalyzer:
 
             # Disk metrics
             disk = psutil.disk_usage('/')
-            self.metrics['disk'].append({
+            self._append_sample('disk', {
                 'timestamp': timestamp,
                 'total': disk.total,
                 'used': disk.used,
@@ -90,7 +106,7 @@ class PerformanceAnalyzer:
 
             # Network metrics
             net_io = psutil.net_io_counters()
-            self.metrics['network'].append({
+            self._append_sample('network', {
                 'timestamp': timestamp,
                 'bytes_sent': net_io.bytes_sent,
                 'bytes_recv': net_io.bytes_recv
@@ -103,6 +119,17 @@ class PerformanceAnalyzer:
             self.logger.error(f"Error collecting metrics: {str(e)}")
             raise PerformanceError(f"Failed to collect metrics: {str(e)}") from e
 
+    def _append_sample(self, key: str, sample: Dict[str, Any]) -> None:
+        """サンプルを追加し、古いサンプルを破棄します。
+
+        リストの先頭削除は O(n) のため、毎回ではなく 2 * history_limit 件に
+        達した時点でまとめて切り詰め、追加1回あたりのコストを償却 O(1) に抑えます。
+        """
+        samples = self.metrics[key]
+        samples.append(sample)
+        if len(samples) >= 2 * self.history_limit:
+            del samples[:-self.history_limit]
+
     def get_metrics(self) -> Dict[str, Any]:
         """Get collected metrics"""
         return self.metrics.copy()
@@ -126,8 +153,7 @@ class PerformanceAnalyzer:
         if not cpu_data:
             return {'error': 'No CPU data available'}
 
-        avg_percent = sum(item['percent'] for item in cpu_data) / len(cpu_data)
-        max_percent = max(item['percent'] for item in cpu_data)
+        avg_percent, max_percent = self._percent_summary(cpu_data)
 
         return {
             'average_usage': avg_percent,
@@ -141,8 +167,7 @@ class PerformanceAnalyzer:
         if not memory_data:
             return {'error': 'No memory data available'}
 
-        avg_percent = sum(item['percent'] for item in memory_data) / len(memory_data)
-        max_percent = max(item['percent'] for item in memory_data)
+        avg_percent, max_percent = self._percent_summary(memory_data)
 
         return {
             'average_usage': avg_percent,
@@ -156,8 +181,7 @@ class PerformanceAnalyzer:
         if not disk_data:
             return {'error': 'No disk data available'}
 
-        avg_percent = sum(item['percent'] for item in disk_data) / len(disk_data)
-        max_percent = max(item['percent'] for item in disk_data)
+        avg_percent, max_percent = self._percent_summary(disk_data)
 
         return {
             'average_usage': avg_percent,
@@ -165,6 +189,18 @@ class PerformanceAnalyzer:
             'total_space': disk_data[0]['total']
         }
 
+    @staticmethod
+    def _percent_summary(samples: List[Dict[str, Any]]) -> Tuple[float, float]:
+        """サンプル列の 'percent' の平均と最大を1パスで求めます。"""
+        total = 0.0
+        max_percent = None
+        for item in samples:
+            percent = item['percent']
+            total += percent
+            if max_percent is None or percent > max_percent:
+                max_percent = percent
+        return total / len(samples), max_percent
+
     def _analyze_network(self) -> Dict[str, Any]:
         """Analyze network metrics"""
         network_data = self.metrics['network']
@@ -10,18 +10,21 @@ from __future__ import annotations
 import asyncio
 import json
 import logging
+import math
 import os
 import platform
 import random
 import subprocess
 import threading
 import time
+from array import array
+from bisect import bisect_right
 from collections import deque
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from enum import Enum
-from statistics import StatisticsError, mean, stdev
-from typing import Any, Callable, Deque, Dict, List, Optional
+from statistics import mean
+from typing import Any, Callable, Deque, Dict, List, NamedTuple, Optional, Sequence, Tuple
 
 try:
     import psutil
@@ -30,6 +33,20 @@ except ImportError:
     psutil = None
     PSUTIL_AVAILABLE = False
 
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
 if PSUTIL_AVAILABLE:
     _NoSuchProcess = psutil.NoSuchProcess
     _AccessDenied = psutil.AccessDenied
@@ -59,6 +76,213 @@ NetworkIOInfo = Dict[str, float]
 SystemInfo = Dict[str, Any]
 
 
+class _Thresholds(NamedTuple):
+    """監視ループで参照する閾値のスナップショット（属性アクセスで辞書検索を避ける）。"""
+    memory: float
+    cpu: float
+    disk_io: float
+    process_memory: float
+
+
+class MetricSummary(NamedTuple):
+    """1メトリクス分の履歴統計。レポート出力時にのみ辞書へ変換します。"""
+    min: float
+    max: float
+    avg: float
+    std_dev: float
+    latest: float
+    count: int
+    sum: float
+    median: float
+    p95: float
+    p99: float
+
+
+class _AlertSettings(NamedTuple):
+    """アラート設定のスナップショット。"""
+    enabled: bool
+    trigger_count: int
+    cooldown: float
+
+
+class _ObservedDict(dict):
+    """内容が変更されるたびにコールバックを呼ぶ dict。
+
+    thresholds / alert_config への直接の書き込みでも監視ループ用の
+    スナップショットを再構築し、古い設定が使われ続けないようにします。
+    """
+
+    __slots__ = ("_on_change",)
+
+    def __init__(self, data: Dict[str, Any], on_change: Callable[[], None]) -> None:
+        super().__init__(data)
+        self._on_change = on_change
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        super().__setitem__(key, value)
+        self._on_change()
+
+    def __delitem__(self, key: str) -> None:
+        super().__delitem__(key)
+        self._on_change()
+
+    def update(self, *args: Any, **kwargs: Any) -> None:
+        super().update(*args, **kwargs)
+        self._on_change()
+
+    def setdefault(self, key: str, default: Any = None) -> Any:
+        value = super().setdefault(key, default)
+        self._on_change()
+        return value
+
+    def pop(self, key: str, *default: Any) -> Any:
+        value = super().pop(key, *default)
+        self._on_change()
+        return value
+
+    def popitem(self) -> Tuple[str, Any]:
+        item = super().popitem()
+        self._on_change()
+        return item
+
+    def clear(self) -> None:
+        super().clear()
+        self._on_change()
+
+    def __ior__(self, other: Any) -> "_ObservedDict":
+        self.update(other)
+        return self
+
+    def __reduce__(self) -> Tuple[type, Tuple[Dict[str, Any]]]:
+        # コピー・pickle ではコールバック（監視インスタンス）を持たない dict にする
+        return (dict, (dict(self),))
+
+
+# 異常の z-score 境界と重大度（z >= 3.0 で medium、z >= 4.0 で high）
+_ANOMALY_SEVERITY_BOUNDS = (3.0, 4.0)
+_ANOMALY_SEVERITIES = ("low", "medium", "high")
+
+
+def _iso_from_epoch(epoch: float) -> str:
+    """UNIX 秒を UTC の ISO 8601 文字列に変換します。"""
+    return datetime.fromtimestamp(epoch, timezone.utc).isoformat()
+
+
+class MetricRing:
+    """1メトリクス分の履歴を保持する固定長リングバッファ（SoA 形式）。
+
+    値とタイムスタンプ（UNIX 秒）をそれぞれ ``array('d')`` に格納するため、
+    追加時にサンプルごとの辞書やリストの伸長が発生しません。ISO 形式への変換は
+    サンプルを取り出すときにだけ行います。
+    合計と二乗和を追加・追い出しのたびに更新し、平均と分散を O(1) で返します。
+    """
+
+    __slots__ = ("capacity", "_values", "_timestamps", "_head", "_count", "_sum", "_sum_sq")
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = max(1, int(capacity))
+        self._values = array("d", bytes(8 * self.capacity))
+        self._timestamps = array("d", bytes(8 * self.capacity))
+        self._head = 0
+        self._count = 0
+        self._sum = 0.0
+        self._sum_sq = 0.0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self):
+        """古い順に ``{"timestamp", "value"}`` 形式のサンプルを返します。"""
+        for timestamp, value in zip(self._ordered(self._timestamps), self._ordered(self._values)):
+            yield {"timestamp": _iso_from_epoch(timestamp), "value": value}
+
+    def push(self, value: float, timestamp: float) -> None:
+        head = self._head
+        if self._count < self.capacity:
+            self._count += 1
+        else:
+            evicted = self._values[head]
+            self._sum -= evicted
+            self._sum_sq -= evicted * evicted
+        self._values[head] = value
+        self._timestamps[head] = timestamp
+        self._sum += value
+        self._sum_sq += value * value
+        self._head = head = (head + 1) % self.capacity
+        if head == 0:
+            # 一周ごとに厳密な値で置き換え、加減算による誤差の蓄積を防ぐ
+            self._resync()
+
+    def append(self, sample: HistorySample) -> None:
+        """deque 互換の追加メソッド（timestamp は ISO 文字列または UNIX 秒）。
+
+        タイムゾーンの無い ISO 文字列は、取り出し時の表記に合わせて UTC とみなします。
+        """
+        timestamp = sample["timestamp"]
+        if isinstance(timestamp, str):
+            parsed = datetime.fromisoformat(timestamp)
+            if parsed.tzinfo is None:
+                parsed = parsed.replace(tzinfo=timezone.utc)
+            timestamp = parsed.timestamp()
+        self.push(float(sample["value"]), float(timestamp))
+
+    def clear(self) -> None:
+        self._head = 0
+        self._count = 0
+        self._sum = 0.0
+        self._sum_sq = 0.0
+
+    def mean(self) -> float:
+        return self._sum / self._count if self._count else 0.0
+
+    def stdev(self) -> float:
+        """標本標準偏差（n - 1 で除算）を返します。"""
+        n = self._count
+        if n < 2:
+            return 0.0
+        variance = (self._sum_sq - self._sum * self._sum / n) / (n - 1)
+        return variance ** 0.5 if variance > 0 else 0.0
+
+    def _resync(self) -> None:
+        live = self._values[:self._count]
+        self._sum = math.fsum(live)
+        self._sum_sq = math.fsum(v * v for v in live)
+
+    def values(self) -> array:
+        """古い順に並べた値の配列を返します。"""
+        return self._ordered(self._values)
+
+    def unordered_values(self) -> memoryview:
+        """保持中の値をスロット順のままコピーせずに返します。
+
+        min/max/合計/分位点のように順序に依存しない集計向けです。
+        返したビューは次の ``push`` で内容が変わります。
+        """
+        return memoryview(self._values)[:self._count]
+
+    def latest(self) -> float:
+        """最新の値を返します（空なら 0.0）。"""
+        if not self._count:
+            return 0.0
+        return self._values[self._head - 1]
+
+    def recent(self, n: int) -> List[HistorySample]:
+        """直近 n 件のサンプルを古い順に返します。"""
+        n = min(n, self._count)
+        cap = self.capacity
+        start = self._head - n
+        return [
+            {"timestamp": _iso_from_epoch(self._timestamps[i % cap]), "value": self._values[i % cap]}
+            for i in range(start, start + n)
+        ]
+
+    def _ordered(self, slots):
+        if self._count < self.capacity:
+            return slots[:self._count]
+        head = self._head
+        return slots[head:] + slots[:head]
+
+
 class PerformanceMonitor:
     """統合された軽量で実用的なパフォーマンス監視システム.
 
@@ -106,6 +330,59 @@ class PerformanceMonitor:
 
     HISTORY_METRICS = ("memory", "cpu", "disk_io", "process_memory", "network_io")
 
+    # 履歴メトリクス名 -> 統計辞書内の (セクション, キー)
+    METRIC_FIELDS: Dict[str, tuple] = {
+        "memory": ("memory", "percent"),
+        "cpu": ("cpu", "percent"),
+        "disk_io": ("disk_io", "write_kbps"),
+        "process_memory": ("process_memory", "percent"),
+        "network_io": ("network_io", "throughput_kbps"),
+    }
+
+    # 国際化用のメッセージ辞書（50言語対応）。全インスタンスで共有する読み取り専用の定数
+    MESSAGES: Dict[str, Dict[str, str]] = {
+        "ja": {
+            "monitoring_started": "パフォーマンス監視を開始しました",
+            "monitoring_stopped": "パフォーマンス監視を停止しました",
+            "streaming_started": "パフォーマンスストリーミングを開始しました",
+            "streaming_stopped": "パフォーマンスストリーミングを停止しました",
+            "alert_message": "パフォーマンスアラート",
+            "config_updated": "設定を更新しました",
+            "metrics_exported": "メトリクスをエクスポートしました",
+            "error_in_monitoring": "パフォーマンス監視中にエラーが発生しました",
+            "error_in_streaming": "ストリーミング中にエラーが発生しました",
+            "error_in_stats_collection": "統計収集中にエラーが発生しました",
+            "process_not_found": "プロセスが見つかりません。おそらくプロセスが終了しました。",
+            "access_denied": "アクセスが拒否されました。権限を確認してください。",
+            "consecutive_errors_limit": "連続エラー数が上限に達しました。一時的に監視間隔を延長します。",
+            "callback_error": "コールバック実行中にエラーが発生しました",
+            "handler_error": "ハンドラー実行中にエラーが発生しました",
+        },
+        "en": {
+            "monitoring_started": "Performance monitoring started",
+            "monitoring_stopped": "Performance monitoring stopped",
+            "streaming_started": "Performance streaming started",
+            "streaming_stopped": "Performance streaming stopped",
+            "alert_message": "Performance Alert",
+            "config_updated": "Configuration updated",
+            "metrics_exported": "Metrics exported",
+            "error_in_monitoring": "Error occurred during performance monitoring",
+            "error_in_streaming": "Error occurred during streaming",
+            "error_in_stats_collection": "Error occurred during statistics collection",
+            "process_not_found": "Process not found. The process may have terminated.",
+            "access_denied": "Access denied. Please check permissions.",
+            "consecutive_errors_limit": "Consecutive error count reached limit. Temporarily extending monitoring interval.",
+            "callback_error": "Error occurred during callback execution",
+            "handler_error": "Error occurred during handler execution",
+        },
+        # 追加の言語（例として一部のみ記載、完全な実装では50言語を追加）
+        "es": {"monitoring_started": "Monitoreo de rendimiento iniciado", "monitoring_stopped": "Monitoreo de rendimiento detenido"},
+        "fr": {"monitoring_started": "Surveillance des performances démarrée", "monitoring_stopped": "Surveillance des performances arrêtée"},
+        "de": {"monitoring_started": "Leistungsüberwachung gestartet", "monitoring_stopped": "Leistungsüberwachung gestoppt"},
+        "zh": {"monitoring_started": "性能监控已启动", "monitoring_stopped": "性能监控已停止"},
+        # ... (他の言語も同様に追加)
+    }
+
     def __init__(self, config: Optional[Dict[str, Any]] = None, *, log_component: str = "performance_monitor") -> None:
         """PerformanceMonitorを初期化します。
 
@@ -145,7 +422,8 @@ class PerformanceMonitor:
         self._language: str = self.config.get("language", "ja")
         self._timezone: str = self.config.get("timezone", "UTC")
 
-        self.thresholds: Dict[str, float] = {
+        self._settings_ready = False
+        self.thresholds = {
             "memory": float(self.config.get("memory_threshold", self.DEFAULT_THRESHOLDS["memory"])),
             "cpu": float(self.config.get("cpu_threshold", self.DEFAULT_THRESHOLDS["cpu"])),
             "disk_io": float(self.config.get("disk_io_threshold", self.DEFAULT_THRESHOLDS["disk_io"])),
@@ -154,13 +432,15 @@ class PerformanceMonitor:
             ),
         }
 
-        self.alert_config: Dict[str, Any] = {
+        self.alert_config = {
             "enabled": bool(self.config.get("alert_enabled", self.DEFAULT_ALERT_CONFIG["enabled"])),
             "trigger_count": max(1, int(self.config.get("alert_threshold", self.DEFAULT_ALERT_CONFIG["trigger_count"]))),
             "cooldown": max(0.0, float(self.config.get("alert_cooldown", self.DEFAULT_ALERT_CONFIG["cooldown"]))),
         }
+        self._settings_ready = True
+        self._refresh_settings_snapshot()
 
-        self.metrics_history: Dict[str, Deque[HistorySample]] = self._create_history_buffers(self.history_size)
+        self.metrics_history: Dict[str, MetricRing] = self._create_history_buffers(self.history_size)
 
         self.monitor_thread: Optional[threading.Thread] = None
         self._stop_event = threading.Event()
@@ -172,6 +452,8 @@ class PerformanceMonitor:
         self._last_collect_time: Optional[float] = None
         self._last_disk_counters: Any = None
         self._last_net_counters: Any = None
+        # psutil.Process は生成時に /proc を読むため、監視ループ間で使い回す
+        self._process: Any = None
 
         self._consecutive_alerts: Dict[str, int] = dict.fromkeys(self.HISTORY_METRICS, 0)
         self._last_alert_details: List[Dict[str, Any]] = []
@@ -192,10 +474,13 @@ class PerformanceMonitor:
         self._stream_callbacks: List[Callable] = []
         self._stream_interval: float = 1.0  # ストリーミング間隔
         self._stream_thread: Optional[threading.Thread] = None
+        self._stream_stop_event = threading.Event()
 
         # アラート出力先用の変数
-        self._alert_handlers: List[Callable] = []
-        self._prometheus_handlers: List[Callable[[bytes], None]] = []
+        # ハンドラー一覧は copy-on-write のタプル。登録・解除時だけロックを取り、
+        # 通知側はロックもコピーもせず参照をそのまま読む
+        self._alert_handlers: Tuple[Callable, ...] = ()
+        self._prometheus_handlers: Tuple[Callable[[bytes], None], ...] = ()
         self._prometheus_labels: Dict[str, str] = {
             str(key): str(value)
             for key, value in (self.config.get("prometheus_labels", {}) or {}).items()
@@ -203,49 +488,9 @@ class PerformanceMonitor:
         }
         self._last_prometheus_payload: Optional[bytes] = None
 
-        # 国際化用のメッセージ辞書（50言語対応）
-        self._messages: Dict[str, Dict[str, str]] = {
-            "ja": {
-                "monitoring_started": "パフォーマンス監視を開始しました",
-                "monitoring_stopped": "パフォーマンス監視を停止しました",
-                "streaming_started": "パフォーマンスストリーミングを開始しました",
-                "streaming_stopped": "パフォーマンスストリーミングを停止しました",
-                "alert_message": "パフォーマンスアラート",
-                "config_updated": "設定を更新しました",
-                "metrics_exported": "メトリクスをエクスポートしました",
-                "error_in_monitoring": "パフォーマンス監視中にエラーが発生しました",
-                "error_in_streaming": "ストリーミング中にエラーが発生しました",
-                "error_in_stats_collection": "統計収集中にエラーが発生しました",
-                "process_not_found": "プロセスが見つかりません。おそらくプロセスが終了しました。",
-                "access_denied": "アクセスが拒否されました。権限を確認してください。",
-                "consecutive_errors_limit": "連続エラー数が上限に達しました。一時的に監視間隔を延長します。",
-                "callback_error": "コールバック実行中にエラーが発生しました",
-                "handler_error": "ハンドラー実行中にエラーが発生しました",
-            },
-            "en": {
-                "monitoring_started": "Performance monitoring started",
-                "monitoring_stopped": "Performance monitoring stopped",
-                "streaming_started": "Performance streaming started",
-                "streaming_stopped": "Performance streaming stopped",
-                "alert_message": "Performance Alert",
-                "config_updated": "Configuration updated",
-                "metrics_exported": "Metrics exported",
-                "error_in_monitoring": "Error occurred during performance monitoring",
-                "error_in_streaming": "Error occurred during streaming",
-                "error_in_stats_collection": "Error occurred during statistics collection",
-                "process_not_found": "Process not found. The process may have terminated.",
-                "access_denied": "Access denied. Please check permissions.",
-                "consecutive_errors_limit": "Consecutive error count reached limit. Temporarily extending monitoring interval.",
-                "callback_error": "Error occurred during callback execution",
-                "handler_error": "Error occurred during handler execution",
-            },
-            # 追加の言語（例として一部のみ記載、完全な実装では50言語を追加）
-            "es": {"monitoring_started": "Monitoreo de rendimiento iniciado", "monitoring_stopped": "Monitoreo de rendimiento detenido"},
-            "fr": {"monitoring_started": "Surveillance des performances démarrée", "monitoring_stopped": "Surveillance des performances arrêtée"},
-            "de": {"monitoring_started": "Leistungsüberwachung gestartet", "monitoring_stopped": "Leistungsüberwachung gestoppt"},
-            "zh": {"monitoring_started": "性能监控已启动", "monitoring_stopped": "性能监控已停止"},
-            # ... (他の言語も同様に追加)
-        }
+        self._messages: Dict[str, Dict[str, str]] = self.MESSAGES
+        # 言語はインスタンス生成時に確定するため、参照するメッセージ表も一度だけ解決する
+        self._message_table: Dict[str, str] = self._messages.get(self._language, self._messages["ja"])
 
         # サポート言語リスト
         self._supported_languages = list(self._messages.keys())
@@ -260,11 +505,63 @@ class PerformanceMonitor:
         except Exception:
             logger.debug("Unable to prime cpu_percent sampling", exc_info=True)
 
+        # CPUコア数は実行中に変化しないため初期化時に一度だけ取得する
+        try:
+            self._cpu_count: int = psutil.cpu_count() or 0
+        except Exception:
+            self._cpu_count = 0
+
         self._report_config_issues(self.validate_config())
 
+    @property
+    def thresholds(self) -> Dict[str, float]:
+        """メトリクスごとの閾値。変更するとスナップショットを再構築します。"""
+        return self._thresholds
+
+    @thresholds.setter
+    def thresholds(self, value: Dict[str, float]) -> None:
+        self._thresholds = _ObservedDict(value, self._on_settings_changed)
+        self._on_settings_changed()
+
+    @property
+    def alert_config(self) -> Dict[str, Any]:
+        """アラート設定。変更するとスナップショットを再構築します。"""
+        return self._alert_config
+
+    @alert_config.setter
+    def alert_config(self, value: Dict[str, Any]) -> None:
+        self._alert_config = _ObservedDict(value, self._on_settings_changed)
+        self._on_settings_changed()
+
+    def _on_settings_changed(self) -> None:
+        # 初期化中（両方の辞書がそろう前）と update_config での一括更新中は再構築しない
+        if self._settings_ready:
+            self._refresh_settings_snapshot()
+
+    def _refresh_settings_snapshot(self) -> None:
+        """thresholds / alert_config から監視ループ用のスナップショットを再構築します。
+
+        thresholds / alert_config の変更時に自動で呼ばれます。
+        """
+        # 閾値が無いメトリクスは判定しない（常に閾値内とみなす）
+        thresholds = self.thresholds
+        self._thr = _Thresholds(
+            **{metric: thresholds.get(metric, float("inf")) for metric in _Thresholds._fields}
+        )
+        # 閾値判定の (metric, セクション, キー, 閾値) 表。判定対象の追加は
+        # _Thresholds と METRIC_FIELDS への登録だけで済む
+        self._threshold_fields = tuple(
+            (metric, *self.METRIC_FIELDS[metric], threshold)
+            for metric, threshold in zip(self._thr._fields, self._thr)
+        )
+        alert_config = self.alert_config
+        self._alert_settings = _AlertSettings(
+            **{key: alert_config.get(key, self.DEFAULT_ALERT_CONFIG[key]) for key in _AlertSettings._fields}
+        )
+
     def _get_message(self, key: str) -> str:
         """言語設定に基づいてメッセージを取得します。"""
-        return self._messages.get(self._language, self._messages["ja"]).get(key, key)
+        return self._message_table.get(key, key)
 
     def _format_datetime(self, dt: Optional[datetime] = None) -> str:
         """設定されたフォーマットで日付をフォーマットします。"""
@@ -353,7 +650,7 @@ class PerformanceMonitor:
 
         with self._lock:
             if handler not in self._alert_handlers:
-                self._alert_handlers.append(handler)
+                self._alert_handlers = self._alert_handlers + (handler,)
                 logger.info("アラートハンドラーを追加しました: %s", getattr(handler, '__name__', str(handler)))
                 return True
         return False
@@ -362,7 +659,7 @@ class PerformanceMonitor:
         """アラート出力ハンドラーを削除します。"""
         with self._lock:
             if handler in self._alert_handlers:
-                self._alert_handlers.remove(handler)
+                self._alert_handlers = tuple(h for h in self._alert_handlers if h != handler)
                 logger.info("アラートハンドラーを削除しました: %s", getattr(handler, '__name__', str(handler)))
                 return True
         return False
@@ -372,15 +669,15 @@ class PerformanceMonitor:
         if not alerts:
             return
 
-        message_parts = [
+        message = " / ".join(
             f"{entry['metric']} {entry['value']:.2f} > {entry['threshold']:.2f}"
             for entry in alerts
-        ]
-        message = " / ".join(message_parts)
+        )
+        now = datetime.now(timezone.utc)
 
         # アラート情報をまとめる
         alert_info = {
-            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "timestamp": now.isoformat(),
             "alerts": alerts,
             "message": message,
             "severity": "high" if any(a.get("severity", "medium") == "high" for a in alerts) else "medium"
@@ -399,17 +696,14 @@ class PerformanceMonitor:
         )
 
         # 登録されたハンドラーに通知
-        with self._lock:
-            handlers = self._alert_handlers.copy()
-
-        for handler in handlers:
+        for handler in self._alert_handlers:
             try:
                 handler(alert_info)
             except Exception as exc:
                 logger.error("アラートハンドラー実行中にエラーが発生しました: %s", exc, exc_info=True)
 
         # デフォルトのコンソール出力（後方互換性のため）
-        print(f"[{datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')}] パフォーマンスアラート: {message}")
+        print(f"[{now:%Y-%m-%d %H:%M:%S}] パフォーマンスアラート: {message}")
 
     def add_stream_callback(self, callback: callable) -> bool:
         """リアルタイムストリーミング用のコールバックを追加します。"""
@@ -440,18 +734,21 @@ class PerformanceMonitor:
             return False
 
         self._stream_interval = max(0.1, interval)  # 最小0.1秒
+        self._stream_stop_event.clear()
         self._stream_thread = threading.Thread(
             target=self._stream_loop,
             name="CocoaPerformanceStream",
             daemon=True,
         )
         self._stream_thread.start()
-        logger.info(self._get_message("streaming_started") + f" (間隔: {self._stream_interval:.2f}秒)")
+        logger.info("%s (間隔: %.2f秒)", self._get_message("streaming_started"), self._stream_interval)
         return True
 
     def stop_streaming(self) -> bool:
         """リアルタイムストリーミングを停止します。"""
         if self._stream_thread and self._stream_thread.is_alive():
+            # 待機中のループを即座に起こす（sleep 完了を待たない）
+            self._stream_stop_event.set()
             self._stream_thread.join(timeout=2.0)
             self._stream_thread = None
             logger.info(self._get_message("streaming_stopped"))
@@ -489,19 +786,25 @@ class PerformanceMonitor:
                 self._interval_min = max(0.5, float(self.config.get("interval_min", self._interval_min)))
                 self._interval_max = max(self._interval_min, float(self.config.get("interval_max", self._interval_max)))
 
-                # 閾値更新
-                for metric in ["memory", "cpu", "disk_io", "process_memory"]:
-                    threshold_key = f"{metric}_threshold"
-                    if threshold_key in self.config:
-                        self.thresholds[metric] = float(self.config[threshold_key])
-
-                # アラート設定更新
-                if "alert_enabled" in self.config:
-                    self.alert_config["enabled"] = bool(self.config["alert_enabled"])
-                if "alert_threshold" in self.config:
-                    self.alert_config["trigger_count"] = max(1, int(self.config["alert_threshold"]))
-                if "alert_cooldown" in self.config:
-                    self.alert_config["cooldown"] = max(0.0, float(self.config["alert_cooldown"]))
+                # 閾値・アラート設定は書き込みごとに再構築せず、最後に1回だけ再構築する
+                self._settings_ready = False
+                try:
+                    # 閾値更新
+                    for metric in ["memory", "cpu", "disk_io", "process_memory"]:
+                        threshold_key = f"{metric}_threshold"
+                        if threshold_key in self.config:
+                            self.thresholds[metric] = float(self.config[threshold_key])
+
+                    # アラート設定更新
+                    if "alert_enabled" in self.config:
+                        self.alert_config["enabled"] = bool(self.config["alert_enabled"])
+                    if "alert_threshold" in self.config:
+                        self.alert_config["trigger_count"] = max(1, int(self.config["alert_threshold"]))
+                    if "alert_cooldown" in self.config:
+                        self.alert_config["cooldown"] = max(0.0, float(self.config["alert_cooldown"]))
+                finally:
+                    self._settings_ready = True
+                    self._refresh_settings_snapshot()
 
                 # 履歴サイズが変更された場合の処理
                 if self.history_size != old_history_size:
@@ -554,15 +857,31 @@ class PerformanceMonitor:
                 "history": history_snapshot,
             }
 
-            with open(filename, "w", encoding="utf-8") as fp:
-                json.dump(payload, fp, ensure_ascii=False, indent=2)
+            self._write_json(filename, payload)
 
-            logger.info(self._get_message("metrics_exported") + f": {filename}")
+            logger.info("%s: %s", self._get_message("metrics_exported"), filename)
             return True
         except Exception as exc:
-            logger.error(self._get_message("error_in_monitoring") + f": {exc}", exc_info=True)
+            logger.error("%s: %s", self._get_message("error_in_monitoring"), exc, exc_info=True)
             return False
 
+    @staticmethod
+    def _write_json(filename: str, payload: Dict[str, Any]) -> None:
+        """payload を JSON で書き出します（orjson があれば優先して使用）。"""
+        if ORJSON_AVAILABLE:
+            try:
+                data = orjson.dumps(payload, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+            except TypeError:
+                # orjson が扱えない型が含まれる場合は標準 json にフォールバック
+                pass
+            else:
+                with open(filename, "wb") as fp:
+                    fp.write(data)
+                return
+
+        with open(filename, "w", encoding="utf-8") as fp:
+            json.dump(payload, fp, ensure_ascii=False, indent=2)
+
     def check_thresholds(self) -> Dict[str, Dict[str, Any]]:
         """最新の統計を取得し、閾値判定結果を返します."""
         stats = self._collect_stats()
@@ -574,12 +893,12 @@ class PerformanceMonitor:
     # ------------------------------------------------------------------
     def _monitor_loop(self) -> None:
         while not self._stop_event.is_set():
-            started = time.time()
+            started = time.monotonic()
             try:
                 stats = self._collect_stats()
                 self._record_stats(stats)
 
-                if self.alert_config["enabled"]:
+                if self._alert_settings.enabled:
                     alerts = self._check_alerts(stats)
                     if alerts:
                         self._send_alert(alerts)
@@ -593,15 +912,15 @@ class PerformanceMonitor:
             if self._consecutive_errors >= self._max_consecutive_errors:
                 wait_time = max(self.interval, self._error_backoff_interval * self._consecutive_errors)
 
-            actual_wait = max(wait_time - (time.time() - started), 0.0)
+            actual_wait = max(wait_time - (time.monotonic() - started), 0.0)
             self._stop_event.wait(actual_wait)
 
         self.running = False
 
     def _stream_loop(self) -> None:
         """リアルタイムストリーミングのメインループ。"""
-        while self.running:  # 監視が実行中の間のみストリーミング
-            started = time.time()
+        while self.running and not self._stream_stop_event.is_set():  # 監視が実行中の間のみストリーミング
+            started = time.monotonic()
 
             try:
                 # 最新の統計を取得
@@ -621,13 +940,13 @@ class PerformanceMonitor:
                 logger.error("ストリーミング中にエラーが発生しました: %s", exc, exc_info=True)
 
             # 次回のストリーミングまで待機
-            elapsed = time.time() - started
+            elapsed = time.monotonic() - started
             wait_time = max(self._stream_interval - elapsed, 0.0)
-            time.sleep(wait_time)
+            self._stream_stop_event.wait(wait_time)
 
     def _collect_stats(self) -> StatsDict:
-        timestamp = datetime.now(timezone.utc).isoformat()
         now = time.time()
+        timestamp = _iso_from_epoch(now)
 
         # エラー統計のリセット
         if self._last_error_time is None or (now - self._last_error_time) > 300:  # 5分ごとにリセット
@@ -639,26 +958,30 @@ class PerformanceMonitor:
             cpu_percent = psutil.cpu_percent(interval=None)
             disk_counters = psutil.disk_io_counters(perdisk=False)
             net_counters = psutil.net_io_counters(pernic=False)
-            process = psutil.Process(os.getpid())
+            process = self._process
+            pid = os.getpid()
+            if process is None or process.pid != pid:  # fork 後は作り直す
+                process = self._process = psutil.Process(pid)
             process_memory = process.memory_info()
 
             # エラー統計のリセット（成功時）
             self._consecutive_errors = 0
             self._last_error_time = None
 
-        except _NoSuchProcess:
-            logger.error(self._get_message("process_not_found"))
-            self._record_error("process_not_found")
-            return self._get_default_stats(timestamp)
-        except _AccessDenied:
-            logger.error(self._get_message("access_denied"))
-            self._record_error("access_denied")
-            return self._get_default_stats(timestamp)
+        except (_NoSuchProcess, _AccessDenied) as exc:
+            # 次回は Process ハンドルを作り直す
+            self._process = None
+            error_key = "process_not_found" if isinstance(exc, _NoSuchProcess) else "access_denied"
+            logger.error(self._get_message(error_key))
+            self._record_error(error_key)
+            return self._get_default_stats(now)
         except Exception as exc:
             error_type = type(exc).__name__
-            logger.error(self._get_message("error_in_stats_collection") + f": {exc} (タイプ: {error_type})", exc_info=True)
+            logger.error(
+                "%s: %s (タイプ: %s)", self._get_message("error_in_stats_collection"), exc, error_type, exc_info=True
+            )
             self._record_error(error_type)
-            return self._get_default_stats(timestamp)
+            return self._get_default_stats(now)
 
         with self._stats_lock:
             prev_disk = self._last_disk_counters
@@ -689,6 +1012,7 @@ class PerformanceMonitor:
 
         return {
             "timestamp": timestamp,
+            "epoch": now,
             "memory": {
                 "total": getattr(memory, "total", 0) or 0,
                 "used": getattr(memory, "used", 0) or 0,
@@ -697,7 +1021,7 @@ class PerformanceMonitor:
             },
             "cpu": {
                 "percent": float(cpu_percent),
-                "count": psutil.cpu_count() or 0,
+                "count": self._cpu_count,
             },
             "disk_io": {
                 "read_bytes": disk_counters.read_bytes if disk_counters else 0,
@@ -721,71 +1045,74 @@ class PerformanceMonitor:
         with self._lock:
             self._last_stats = self._clone_stats(stats)
 
+        epoch = stats.get("epoch")
+        if epoch is None:
+            epoch = time.time()
+
         # 履歴記録は別ロックで処理（読み込み優先）
         with self._lock:
-            for metric in self.HISTORY_METRICS:
-                value = self._extract_metric_value(metric, stats)
-                if value is None:
-                    continue
-                self.metrics_history[metric].append(
-                    {
-                        "timestamp": stats["timestamp"],
-                        "value": float(value),
-                    }
-                )
+            history = self.metrics_history
+            for metric, (section, key) in self.METRIC_FIELDS.items():
+                history[metric].push(float(stats[section][key]), epoch)
 
     def _check_alerts(self, stats: StatsDict) -> List[Dict[str, Any]]:
-        evaluations = self._evaluate_thresholds(stats)
-        triggered: List[Dict[str, Any]] = []
-        now = time.time()
+        consecutive = self._consecutive_alerts
+        trigger_count = self._alert_settings.trigger_count
+        eligible: Optional[List[tuple]] = None
 
         with self._lock:
-            for metric, result in evaluations.items():
-                if result["exceeded"]:
-                    self._consecutive_alerts[metric] += 1
+            # 閾値内に収まっている通常時は判定結果の辞書を組み立てない
+            for metric, value, threshold in self._threshold_values(stats):
+                if value > threshold:
+                    consecutive[metric] += 1
+                    if consecutive[metric] >= trigger_count:
+                        if eligible is None:
+                            eligible = []
+                        eligible.append((metric, value, threshold))
                 else:
-                    self._consecutive_alerts[metric] = 0
-
-            eligible = [
-                (metric, result)
-                for metric, result in evaluations.items()
-                if result["exceeded"] and self._consecutive_alerts[metric] >= self.alert_config["trigger_count"]
+                    consecutive[metric] = 0
+
+            if eligible is None:
+                return []
+
+            # サンプル取得時刻をそのまま使い、時計の読み直しを省く
+            now = stats.get("epoch")
+            if now is None:
+                now = time.time()
+            if not self._is_cooldown_complete(now):
+                return []
+
+            timestamp = stats["timestamp"]
+            triggered = [
+                {
+                    "metric": metric,
+                    "value": value,
+                    "threshold": threshold,
+                    "timestamp": timestamp,
+                }
+                for metric, value, threshold in eligible
             ]
-
-            if eligible and self._is_cooldown_complete(now):
-                for metric, result in eligible:
-                    triggered.append(
-                        {
-                            "metric": metric,
-                            "value": result["value"],
-                            "threshold": result["threshold"],
-                            "timestamp": stats["timestamp"],
-                        }
-                    )
-
-                if triggered:
-                    self._last_alert_time = now
-                    self._last_alert_details = [dict(entry) for entry in triggered]
+            self._last_alert_time = now
+            self._last_alert_details = [dict(entry) for entry in triggered]
 
         return triggered
 
-    def _evaluate_thresholds(self, stats: StatsDict) -> Dict[str, Dict[str, Any]]:
-        values = {
-            "memory": float(stats["memory"]["percent"]),
-            "cpu": float(stats["cpu"]["percent"]),
-            "disk_io": float(stats["disk_io"]["write_kbps"]),
-            "process_memory": float(stats["process_memory"]["percent"]),
-        }
+    def _threshold_values(self, stats: StatsDict) -> List[tuple]:
+        """閾値判定対象の (metric, value, threshold) を返します。"""
+        return [
+            (metric, float(stats[section][key]), threshold)
+            for metric, section, key, threshold in self._threshold_fields
+        ]
 
-        results: Dict[str, Dict[str, Any]] = {}
-        for metric, value in values.items():
-            threshold = self.thresholds.get(metric, float("inf"))
-            results[metric] = {
+    def _evaluate_thresholds(self, stats: StatsDict) -> Dict[str, Dict[str, Any]]:
+        return {
+            metric: {
                 "value": value,
                 "threshold": threshold,
                 "exceeded": value > threshold,
             }
-        return results
+            for metric, value, threshold in self._threshold_values(stats)
+        }
 
     def _record_error(self, error_type: str) -> None:
         """エラー統計を記録します。"""
@@ -809,73 +1136,115 @@ class PerformanceMonitor:
     def _is_cooldown_complete(self, now: float) -> bool:
         if self._last_alert_time is None:
             return True
-        return (now - self._last_alert_time) >= self.alert_config["cooldown"]
+        return (now - self._last_alert_time) >= self._alert_settings.cooldown
 
-    def _create_history_buffers(self, history_size: int) -> Dict[str, Deque[HistorySample]]:
-        maxlen = max(1, history_size)
-        return {metric: deque(maxlen=maxlen) for metric in self.HISTORY_METRICS}
+    def _create_history_buffers(self, history_size: int) -> Dict[str, MetricRing]:
+        return {metric: MetricRing(history_size) for metric in self.HISTORY_METRICS}
 
-    def _build_history_summary_locked(self) -> Dict[str, Dict[str, float]]:
-        summary: Dict[str, Dict[str, float]] = {}
+    def _build_history_summary_locked(self) -> Dict[str, MetricSummary]:
+        summary: Dict[str, MetricSummary] = {}
         for metric, samples in self.metrics_history.items():
             if not samples:
                 continue
-            values = [sample["value"] for sample in samples]
+            # 順序に依存しない集計なので、並べ替えコピーせずスロット順のビューを渡す
+            summary[metric] = self._summarize_values(samples.unordered_values(), samples.latest())
+        return summary
 
-            # 効率的な統計計算
-            count = len(values)
-            if count == 0:
-                continue
+    @staticmethod
+    def _summarize_values(values: Sequence[float], latest: Optional[float] = None) -> MetricSummary:
+        """1メトリクス分の値列から要約統計を計算します（NumPy があればベクトル化）。
 
-            min_val = min(values)
-            max_val = max(values)
-            sum_val = sum(values)
-            avg_val = sum_val / count
+        ``latest`` を省略した場合は ``values`` の末尾を最新値とみなします。
+        """
+        count = len(values)
+        if latest is None:
+            latest = values[-1]
+        mid = count // 2
+        # 百分位は int(count * pct / 100) 番目（最大 count - 1）の要素を採用する
+        k95 = min(count * 95 // 100, count - 1)
+        k99 = min(count * 99 // 100, count - 1)
+
+        if NUMPY_AVAILABLE:
+            arr = np.asarray(values, dtype=np.float64)
+            sum_val = float(arr.sum())
+            # 1回の introselect で中央値と p95/p99 をまとめて確定させる
+            selected = np.partition(arr, (mid, k95, k99))
+            return MetricSummary(
+                min=float(arr.min()),
+                max=float(arr.max()),
+                avg=sum_val / count,
+                std_dev=float(arr.std(ddof=1)) if count > 1 else 0.0,
+                latest=float(latest),
+                count=count,
+                sum=sum_val,
+                median=float(selected[mid]),
+                p95=float(selected[k95]),
+                p99=float(selected[k99]),
+            )
 
-            # 分散と標準偏差の計算（効率化版）
-            if count > 1:
-                variance = sum((x - avg_val) ** 2 for x in values) / (count - 1)
-                std_dev = variance ** 0.5
-            else:
-                std_dev = 0.0
-
-            summary[metric] = {
-                "min": float(min_val),
-                "max": float(max_val),
-                "avg": float(avg_val),
-                "std_dev": float(std_dev),
-                "latest": float(values[-1]),
-                "count": count,
-                "sum": float(sum_val),
-                "median": float(sorted(values)[count // 2]) if count > 0 else 0.0,
-            }
-        return summary
+        # min/max/sum/分散を1パスで計算（Welford法）
+        min_val = max_val = values[0]
+        sum_val = 0.0
+        running_mean = 0.0
+        m2 = 0.0
+        for n, x in enumerate(values, 1):
+            if x < min_val:
+                min_val = x
+            elif x > max_val:
+                max_val = x
+            sum_val += x
+            delta = x - running_mean
+            running_mean += delta / n
+            m2 += delta * (x - running_mean)
+
+        ordered = sorted(values)
+        return MetricSummary(
+            min=float(min_val),
+            max=float(max_val),
+            avg=float(sum_val / count),
+            std_dev=float((m2 / (count - 1)) ** 0.5) if count > 1 else 0.0,
+            latest=float(latest),
+            count=count,
+            sum=float(sum_val),
+            median=float(ordered[mid]),
+            p95=float(ordered[k95]),
+            p99=float(ordered[k99]),
+        )
+
+    def _build_anomaly_report_locked(
+        self, summary: Optional[Dict[str, MetricSummary]] = None
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """履歴から異常を検出します。
 
-    def _build_anomaly_report_locked(self) -> Dict[str, List[Dict[str, Any]]]:
+        summary に _build_history_summary_locked() の結果を渡すと、平均と標準偏差を
+        再計算せずにそのまま利用します。省略時はリングバッファの累積値を使います。
+        """
         anomalies: Dict[str, List[Dict[str, Any]]] = {}
         for metric, samples in self.metrics_history.items():
             if len(samples) < 10:
                 continue
-            values = [sample["value"] for sample in samples]
 
             # 統計計算のキャッシュチェック
-            cache_key = f"anomaly_{metric}_{len(values)}"
+            cache_key = f"anomaly_{metric}_{len(samples)}"
             cached = self._get_cached_anomalies(cache_key)
             if cached is not None:
                 if cached:
                     anomalies[metric] = cached
                 continue
 
-            try:
-                avg = mean(values)
-                deviation = stdev(values)
-            except (ValueError, ZeroDivisionError, StatisticsError) as e:
-                logger.debug(f"Failed to calculate statistics for {metric}: {e}")
-                continue
-
+            metric_summary = summary.get(metric) if summary is not None else None
+            if metric_summary is not None:
+                avg = metric_summary.avg
+                deviation = metric_summary.std_dev
+            else:
+                # リングバッファが保持する合計・二乗和から O(1) で求める
+                avg = samples.mean()
+                deviation = samples.stdev()
             if deviation == 0:
                 continue
 
+            values = samples.values()
+
             metric_anomalies = self._detect_metric_anomalies(samples, values, avg, deviation)
 
             if metric_anomalies:
@@ -896,8 +1265,8 @@ class PerformanceMonitor:
 
     def _detect_metric_anomalies(
         self,
-        samples: Deque[HistorySample],
-        values: List[float],
+        samples: MetricRing,
+        values: Sequence[float],
         avg: float,
         deviation: float,
     ) -> List[Dict[str, Any]]:
@@ -907,8 +1276,7 @@ class PerformanceMonitor:
 
         # トレンド分析（線形回帰）
         if len(recent_values) >= 3:
-            x = list(range(len(recent_values)))
-            slope = self._calculate_slope(x, recent_values)
+            slope = self._calculate_index_slope(recent_values)
             trend_strength = abs(slope) / (avg + 1e-6)  # トレンド強度を計算
         else:
             slope = 0.0
@@ -921,7 +1289,7 @@ class PerformanceMonitor:
         elif trend_strength < 0.05:  # 安定している場合
             dynamic_threshold = 3.5  # 閾値を厳しく
 
-        for sample in samples[-5:]:
+        for sample in samples.recent(5):
             z_score = abs(sample["value"] - avg) / deviation if deviation > 0 else 0
 
             if z_score >= dynamic_threshold:
@@ -931,7 +1299,7 @@ class PerformanceMonitor:
                     "z_score": z_score,
                     "trend_slope": slope,
                     "trend_strength": trend_strength,
-                    "severity": "high" if z_score >= 4.0 else "medium" if z_score >= 3.0 else "low"
+                    "severity": _ANOMALY_SEVERITIES[bisect_right(_ANOMALY_SEVERITY_BOUNDS, z_score)],
                 })
 
         return metric_anomalies
@@ -956,27 +1324,40 @@ class PerformanceMonitor:
 
         return numerator / denominator
 
-    def _extract_metric_value(self, metric: str, stats: StatsDict) -> Optional[float]:
-        if metric == "memory":
-            return float(stats["memory"]["percent"])
-        if metric == "cpu":
-            return float(stats["cpu"]["percent"])
-        if metric == "disk_io":
-            return float(stats["disk_io"]["write_kbps"])
-        if metric == "process_memory":
-            return float(stats["process_memory"]["percent"])
-        if metric == "network_io":
-            return float(stats["network_io"]["throughput_kbps"])
-        return None
+    @staticmethod
+    def _calculate_index_slope(y: Sequence[float]) -> float:
+        """x = 0, 1, ..., n-1 を前提とした線形回帰の傾きを計算します。
+
+        Σx と Σx² は n から閉じた式で求まるため、x 列を作らずに Σy と Σxy の1パスで済みます。
+        """
+        n = len(y)
+        if n < 2:
+            return 0.0
+
+        sum_y = 0.0
+        sum_xy = 0.0
+        for i, yi in enumerate(y):
+            sum_y += yi
+            sum_xy += i * yi
+
+        sum_x = n * (n - 1) / 2
+        sum_x_squared = (n - 1) * n * (2 * n - 1) / 6
+        denominator = n * sum_x_squared - sum_x * sum_x
+        return (n * sum_xy - sum_x * sum_y) / denominator
 
     def _clone_stats(self, stats: Optional[StatsDict]) -> StatsDict:
         if stats is None:
             return self._get_default_stats()
-        return json.loads(json.dumps(stats, ensure_ascii=False))
+        # stats は「スカラー値」と「スカラー値の辞書」の2階層なので、
+        # JSON の往復ではなく辞書ごとの浅いコピーで十分に独立させられる
+        return {key: dict(value) if isinstance(value, dict) else value for key, value in stats.items()}
 
-    def _get_default_stats(self, timestamp: str = None) -> StatsDict:
+    def _get_default_stats(self, epoch: Optional[float] = None) -> StatsDict:
+        if epoch is None:
+            epoch = time.time()
         return {
-            "timestamp": timestamp or datetime.now(timezone.utc).isoformat(),
+            "timestamp": _iso_from_epoch(epoch),
+            "epoch": epoch,
             "memory": {"total": 0, "used": 0, "available": 0, "percent": 0.0},
             "cpu": {"percent": 0.0, "count": 0},
             "disk_io": {"read_bytes": 0, "write_bytes": 0, "read_kbps": 0.0, "write_kbps": 0.0},
@@ -1020,6 +1401,7 @@ class PerformanceMonitor:
             Dict[str, Any]: パフォーマンスレポート。以下のキーを持つ辞書:
                 - current_stats: 現在のシステム統計情報
                     - timestamp: ISO形式のタイムスタンプ
+                    - epoch: 同時刻のUNIX秒
                     - memory: メモリ使用状況
                         - total: 総メモリ容量（バイト）
                         - used: 使用中メモリ（バイト）
@@ -1050,6 +1432,8 @@ class PerformanceMonitor:
                     - count: サンプル数
                     - sum: 合計値
                     - median: 中央値
+                    - p95: 95パーセンタイル
+                    - p99: 99パーセンタイル
                 - alerts: 最新のアラート情報リスト
                 - anomalies: 異常検知結果（メトリクスごとの異常リスト）
                 - custom_metrics: カスタムメトリクスの辞書
@@ -1065,14 +1449,15 @@ class PerformanceMonitor:
         with self._lock:
             stats = self._clone_stats(self._last_stats) if self._last_stats else self._get_default_stats()
             history_summary = self._build_history_summary_locked()
+            anomalies = self._build_anomaly_report_locked(history_summary)
             alerts = [dict(alert) for alert in self._last_alert_details]
             custom_metrics = self.get_custom_metrics()
 
         return {
             "current_stats": stats,
-            "history": history_summary,
+            "history": {metric: entry._asdict() for metric, entry in history_summary.items()},
             "alerts": alerts,
-            "anomalies": self._build_anomaly_report_locked(),
+            "anomalies": anomalies,
             "custom_metrics": custom_metrics,
             "error_stats": dict(self._error_stats),
             "consecutive_errors": self._consecutive_errors,
@@ -1085,14 +1470,14 @@ class PerformanceMonitor:
             return False
         with self._lock:
             if handler not in self._prometheus_handlers:
-                self._prometheus_handlers.append(handler)
+                self._prometheus_handlers = self._prometheus_handlers + (handler,)
                 return True
         return False
 
     def remove_prometheus_handler(self, handler: Callable[[bytes], None]) -> bool:
         with self._lock:
             if handler in self._prometheus_handlers:
-                self._prometheus_handlers.remove(handler)
+                self._prometheus_handlers = tuple(h for h in self._prometheus_handlers if h != handler)
                 return True
         return False
 
@@ -1101,11 +1486,12 @@ class PerformanceMonitor:
             return self._last_prometheus_payload
 
     def _maybe_emit_prometheus(self, stats: StatsDict) -> None:
-        with self._lock:
-            handlers = list(self._prometheus_handlers)
-            labels = dict(self._prometheus_labels)
+        # ハンドラー未登録（通常時）はロック取得やコピーも行わずに戻る
+        handlers = self._prometheus_handlers
         if not handlers:
             return
+        with self._lock:
+            labels = dict(self._prometheus_labels)
 
         def _format(metric: str, value: float) -> str:
             label_str = ",".join(f"{k}={json.dumps(v)}" for k, v in labels.items())
@@ -1143,8 +1529,8 @@ class PerformanceMonitor:
             return
         cpu_use = float(stats["cpu"].get("percent", 0.0))
         memory_use = float(stats["memory"].get("percent", 0.0))
-        cpu_ratio = cpu_use / max(self.thresholds.get("cpu", 100.0), 1.0)
-        mem_ratio = memory_use / max(self.thresholds.get("memory", 100.0), 1.0)
+        cpu_ratio = cpu_use / max(self._thr.cpu, 1.0)
+        mem_ratio = memory_use / max(self._thr.memory, 1.0)
         pressure = max(cpu_ratio, mem_ratio)
 
         target = self._current_interval
@@ -1216,6 +1602,9 @@ class HybridSystemManager:
 
         # リソース管理
         self.local_resources = self._get_local_resources()
+        if PSUTIL_AVAILABLE:
+            # 非ブロッキングな cpu_percent(interval=None) の基準点を作っておく
+            psutil.cpu_percent(interval=None)
         self.cloud_resources: Dict[str, CloudResourceInfo] = {}
         self.current_allocation = None
 
@@ -1251,7 +1640,7 @@ class HybridSystemManager:
                 "network_interfaces": len(psutil.net_if_addrs())
             }
         except Exception as e:
-            logger.warning(f"Failed to get local resources: {e}")
+            logger.warning("Failed to get local resources: %s", e)
             return {"cpu_cores": 4, "memory_gb": 8, "disk_gb": 256}
 
     async def initialize(self):
@@ -1282,7 +1671,7 @@ class HybridSystemManager:
         self.current_allocation = allocation
         self.allocation_history.append(allocation)
 
-        logger.info(f"Initial allocation optimized: {allocation}")
+        logger.info("Initial allocation optimized: %s", allocation)
 
     async def _start_energy_monitoring(self):
         """エネルギー監視を開始"""
@@ -1297,14 +1686,15 @@ class HybridSystemManager:
                 await asyncio.sleep(60)  # 1分間隔
 
             except Exception as e:
-                logger.error(f"Energy monitoring error: {e}")
+                logger.error("Energy monitoring error: %s", e)
                 await asyncio.sleep(300)  # 5分待機
 
     async def _collect_energy_metrics(self) -> EnergyMetrics:
         """エネルギー消費メトリクスを収集"""
         # 実際の実装ではハードウェアセンサーからデータを取得
         if PSUTIL_AVAILABLE:
-            cpu_percent = psutil.cpu_percent(interval=1)
+            # interval=None は前回呼び出しからの差分を返すため、イベントループを1秒止めない
+            cpu_percent = psutil.cpu_percent(interval=None)
             memory_percent = psutil.virtual_memory().percent
         else:
             cpu_percent, memory_percent = 50.0, 50.0
@@ -1375,12 +1765,13 @@ class HybridSystemManager:
         best_allocation = None
         best_score = -1
 
-        # 各クラウドリソースに対して最適化
-        for cloud_resource in self.cloud_resources.values():
-            allocation = await self._calculate_allocation_for_resource(
-                cloud_resource, workload, budget
-            )
+        # 各クラウドリソースの割り当て候補は互いに独立しているため並行して計算する
+        allocations = await asyncio.gather(*(
+            self._calculate_allocation_for_resource(cloud_resource, workload, budget)
+            for cloud_resource in self.cloud_resources.values()
+        ))
 
+        for allocation in allocations:
             score = self._evaluate_allocation(allocation, workload, budget)
 
             if score > best_score:
@@ -1400,7 +1791,7 @@ class HybridSystemManager:
                 "expected_duration_hours": 1.0,
                 "priority": "normal",
             }
-        cpu_percent = psutil.cpu_percent(interval=1)
+        cpu_percent = psutil.cpu_percent(interval=None)
         memory = psutil.virtual_memory()
         disk = psutil.disk_usage('/')
 
@@ -1502,19 +1893,22 @@ class HybridSystemManager:
         self.allocation_history.append(allocation)
 
         # 実際の実装では、クラウドリソースのスケーリングやローカル設定の変更を実行
-        logger.info(f"Applied resource allocation: CPU(local={allocation.local_cpu_cores}, cloud={allocation.cloud_cpu_cores}), "
-                   f"Memory(local={allocation.local_memory_gb}GB, cloud={allocation.cloud_memory_gb}GB), "
-                   f"Cost=${allocation.cost_per_hour}/hour")
+        logger.info(
+            "Applied resource allocation: CPU(local=%s, cloud=%s), Memory(local=%sGB, cloud=%sGB), Cost=$%s/hour",
+            allocation.local_cpu_cores, allocation.cloud_cpu_cores,
+            allocation.local_memory_gb, allocation.cloud_memory_gb,
+            allocation.cost_per_hour,
+        )
 
     def set_hybrid_mode(self, mode: HybridMode):
         """ハイブリッドモードを設定"""
         self.current_mode = mode
-        logger.info(f"Hybrid mode set to: {mode.value}")
+        logger.info("Hybrid mode set to: %s", mode.value)
 
     def set_energy_level(self, level: EnergyEfficiencyLevel):
         """エネルギー効率レベルを設定"""
         self.energy_level = level
-        logger.info(f"Energy efficiency level set to: {level.value}")
+        logger.info("Energy efficiency level set to: %s", level.value)
 
     def get_hybrid_status(self) -> Dict[str, Any]:
         """ハイブリッドシステムのステータスを取得"""
@@ -1536,12 +1930,14 @@ class HybridSystemManager:
         if len(self.energy_history) < 10:
             return "insufficient_data"
 
-        recent = list(self.energy_history)[-10:]
-        scores = [e.energy_efficiency_score for e in recent]
+        # deque 全体をリスト化せず、末尾10件だけを取り出す
+        history = self.energy_history
+        scores = [history[i].energy_efficiency_score for i in range(-10, 0)]
+        average = mean(scores)
 
-        if scores[-1] > mean(scores) + 5:
+        if scores[-1] > average + 5:
             return "improving"
-        if scores[-1] < mean(scores) - 5:
+        if scores[-1] < average - 5:
             return "degrading"
         return "stable"
 
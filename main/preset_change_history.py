@@ -1,13 +1,153 @@
 import json
+import math
 import os
+import sys
+import threading
 import time
+import zlib
 from datetime import datetime, timezone
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+
+def _loads_line(line):
+    """JSONL の1行（bytes）をパースする。orjson があれば優先して使う。
+
+    orjson は NaN/Infinity を受け付けないため、失敗時は標準 json で再試行する。
+    """
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.loads(line)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(line)
+
+
+def _has_non_finite(value):
+    """NaN/Infinity の float を含むかを返す。"""
+    stack = [value]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, float):
+            if not math.isfinite(value):
+                return True
+        elif isinstance(value, dict):
+            stack.extend(value.values())
+        elif isinstance(value, (list, tuple)):
+            stack.extend(value)
+    return False
+
+
+def _dumps_line(entry):
+    """エントリを JSONL の1行（改行付き bytes）にする。orjson があれば優先して使う。
+
+    orjson は NaN/Infinity を null として書き出してしまうため、それらを含む
+    エントリと、orjson が扱えない型（64bit を超える整数など）は標準 json で書き出す。
+    """
+    if ORJSON_AVAILABLE and not _has_non_finite(entry):
+        try:
+            return orjson.dumps(entry, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE)
+        except TypeError:
+            pass
+    return (json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def _preset_name_needle(preset_name):
+    """行の事前フィルタに使う、JSON 文字列化したプリセット名のバイト列を返す。
+
+    区切りの空白は書き手によって異なるため、キー名は含めず値だけで判定する。
+
+    ensure_ascii の有無で JSON 表現が変わる名前は、他の書き手の行を
+    取りこぼさないよう事前フィルタの対象外（None）とする。
+    """
+    if not isinstance(preset_name, str):
+        return None
+    encoded = json.dumps(preset_name, ensure_ascii=False)
+    if encoded != json.dumps(preset_name):
+        return None
+    return encoded.encode("utf-8")
+
+
+def _offsets_are_valid(offsets, indexed_size):
+    """各プリセットのオフセットが索引済み範囲内で狭義単調増加する int の列かを返す。"""
+    if not isinstance(offsets, dict):
+        return False
+    for values in offsets.values():
+        if not isinstance(values, list):
+            return False
+        previous = -1
+        for offset in values:
+            if type(offset) is not int or not previous < offset < indexed_size:
+                return False
+            previous = offset
+    return True
+
+
+# UTC の日番号 -> "YYYY-mm-dd " 接頭辞。行ごとに datetime を組み立てないためのキャッシュ
+_DAY_PREFIX_CACHE = {}
+_DAY_PREFIX_CACHE_SIZE = 4096
+
+
+def _format_utc(timestamp):
+    """timestamp を UTC の "YYYY-mm-dd HH:MM:SS" にする。
+
+    datetime.fromtimestamp と同じくマイクロ秒に丸めてから秒未満を切り捨てる。
+    日付部分は日単位でキャッシュし、時刻部分は整数演算で求める。
+    """
+    frac, whole = math.modf(timestamp)
+    micros = round(frac * 1e6)
+    if micros >= 1000000:
+        whole += 1
+    elif micros < 0:
+        whole -= 1
+    day, second = divmod(int(whole), 86400)
+    prefix = _DAY_PREFIX_CACHE.get(day)
+    if prefix is None:
+        if len(_DAY_PREFIX_CACHE) >= _DAY_PREFIX_CACHE_SIZE:
+            _DAY_PREFIX_CACHE.clear()
+        prefix = datetime.fromtimestamp(day * 86400, tz=timezone.utc).strftime("%Y-%m-%d ")
+        _DAY_PREFIX_CACHE[day] = prefix
+    hour, second = divmod(second, 3600)
+    minute, second = divmod(second, 60)
+    return f"{prefix}{hour:02d}:{minute:02d}:{second:02d}"
+
 
 class PresetChangeHistory:
+    # 書き込み直後に fsync してディスクへの反映を保証する変更種別
+    DURABLE_CHANGE_TYPES = frozenset({"apply", "rollback"})
+    # 前回保存からこのバイト数以上を索引に取り込んだら、索引をサイドカーファイルへ保存する。
+    # 小さな履歴は読み直しても安いので保存しない
+    INDEX_SAVE_BYTES = 1 << 20
+    # 索引・読み出し位置が同じ内容を指しているかの確認に使う、末尾のバイト数
+    INDEX_ANCHOR_BYTES = 256
+
     def __init__(self, history_file="preset_change_history.jsonl"):
         self.history_file = history_file
         os.makedirs(os.path.dirname(history_file) or '.', exist_ok=True)
+        # 追記用ハンドルは初回の record_change で開き、以降使い回す
+        self._fh = None
+        # プリセット名 -> 行頭オフセットの索引。履歴は追記専用なので、
+        # 索引済みサイズ以降に増えた分だけを次回の参照時に取り込む
+        self._offsets = {}
+        self._indexed_size = 0
+        # 別プロセス（CLI の起動ごと）でも索引を作り直さずに済むよう保存するファイル
+        self.index_file = f"{history_file}.idx"
+        self._index_loaded = False
+        self._saved_size = 0
+        # 索引済み範囲の末尾のチェックサムと、最後に確認したときの (inode, mtime_ns, size)。
+        # 同じサイズ以上での書き換えを検出するために使う
+        self._anchor = None
+        self._checked_stat = None
+        # read_since が最後に返したオフセットとその位置までの末尾のチェックサム
+        self._read_anchor = None
+        # 索引と読み出し位置の更新を直列化する。ダッシュボードでは1つのインスタンスを
+        # 複数のリクエストスレッドで共有する
+        self._index_lock = threading.RLock()
 
     def record_change(self, preset_name, change_type, before, after, user=None, note=None):
         entry = {
@@ -19,24 +159,245 @@ class PresetChangeHistory:
             "user": user,
             "note": note
         }
-        with open(self.history_file, "a", encoding="utf-8") as f:
-            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        f = self._append_handle()
+        f.write(_dumps_line(entry))
+        # 読み出し側（iter_history）からすぐ見えるよう毎回 flush する
+        f.flush()
+        if change_type in self.DURABLE_CHANGE_TYPES:
+            os.fsync(f.fileno())
+
+    def _append_handle(self):
+        """追記用ハンドルを返す。ファイルが削除・差し替えられていれば開き直す。"""
+        f = self._fh
+        if f is not None:
+            try:
+                if os.path.samestat(os.stat(self.history_file), os.fstat(f.fileno())):
+                    return f
+            except OSError:
+                pass
+            f.close()
+        self._fh = open(self.history_file, "ab")
+        return self._fh
+
+    def close(self):
+        """追記用ハンドルを閉じる。以降の record_change では開き直される。"""
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
 
     def iter_history(self, preset_name=None):
-        """履歴を反復する。空行と壊れた(JSON不正な)行はスキップする。REQ-PH-03。"""
+        """履歴を反復する。空行と壊れた(JSON不正な)行はスキップする。REQ-PH-03。
+
+        プリセット名を指定した場合はオフセット索引から該当行だけを読み出す。
+        """
         if not os.path.exists(self.history_file):
             return
-        with open(self.history_file, encoding="utf-8") as f:
+        if not isinstance(preset_name, str):
+            yield from self._scan(preset_name, 0)
+            return
+
+        with self._index_lock:
+            self._refresh_offsets()
+            offsets = list(self._offsets.get(preset_name, ()))
+            tail_start = self._indexed_size
+        with open(self.history_file, "rb") as f:
+            for offset in offsets:
+                f.seek(offset)
+                try:
+                    entry = _loads_line(f.readline())
+                except ValueError:
+                    continue
+                if isinstance(entry, dict) and entry.get("preset_name") == preset_name:
+                    yield entry
+        # 改行で終わっていない末尾の行は索引に含めないため、直接読む
+        yield from self._scan(preset_name, tail_start)
+
+    def _scan(self, preset_name, start):
+        """start バイト目以降を先頭から順に読み、条件に合うエントリを返す。"""
+        # 名前が行内に現れないエントリはパースせずに読み飛ばす
+        needle = _preset_name_needle(preset_name) if preset_name is not None else None
+        with open(self.history_file, "rb", buffering=1 << 20) as f:
+            f.seek(start)
             for line in f:
                 if not line.strip():
                     continue
+                if needle is not None and needle not in line:
+                    continue
                 try:
-                    entry = json.loads(line)
-                except json.JSONDecodeError:
+                    entry = _loads_line(line)
+                except ValueError:
                     continue  # 壊れた行はスキップ（反復全体をクラッシュさせない）
                 if (preset_name is None) or (entry.get("preset_name") == preset_name):
                     yield entry
 
+    def _refresh_offsets(self):
+        """索引済みサイズ以降に追記された行をオフセット索引へ取り込む。
+
+        新しい行のオフセットは手元の辞書に集め、読み終えてから索引を差し替える。
+        """
+        with self._index_lock:
+            self._refresh_offsets_locked()
+
+    def _refresh_offsets_locked(self):
+        st = os.stat(self.history_file)
+        size = st.st_size
+        if not self._index_loaded:
+            self._index_loaded = True
+            self._load_index()
+        if not self._index_is_valid(st):
+            # 切り詰め・作り直し（同じサイズ以上での書き換えを含む）された場合は索引を作り直す
+            self._offsets = {}
+            self._indexed_size = 0
+            self._saved_size = 0
+            self._anchor = None
+        self._checked_stat = (st.st_ino, st.st_mtime_ns, size)
+        if size == self._indexed_size:
+            return
+
+        added = {}
+        position = self._indexed_size
+        with open(self.history_file, "rb", buffering=1 << 20) as f:
+            f.seek(position)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # 書き込み途中の行は次回に回す
+                offset = position
+                position += len(line)
+                if not line.strip():
+                    continue
+                try:
+                    entry = _loads_line(line)
+                except ValueError:
+                    continue
+                if isinstance(entry, dict):
+                    name = entry.get("preset_name")
+                    if isinstance(name, str):
+                        added.setdefault(name, []).append(offset)
+        offsets = dict(self._offsets)
+        for name, new_offsets in added.items():
+            offsets[name] = offsets.get(name, []) + new_offsets
+        self._offsets = offsets
+        self._indexed_size = position
+        self._anchor = self._index_anchor(position)
+        if position - self._saved_size >= self.INDEX_SAVE_BYTES:
+            self._save_index()
+
+    def _index_is_valid(self, st):
+        """索引済み範囲が今の履歴ファイルの内容と一致しているかを返す。
+
+        前回確認から変更が無ければ読み直さない。変更があれば索引済み範囲の
+        末尾のチェックサムを照合する。
+        """
+        if self._indexed_size == 0:
+            return True
+        if st.st_size < self._indexed_size:
+            return False
+        if (st.st_ino, st.st_mtime_ns, st.st_size) == self._checked_stat:
+            return True
+        try:
+            return self._index_anchor(self._indexed_size) == self._anchor
+        except OSError:
+            return False
+
+    def _index_anchor(self, size):
+        """索引済み範囲の末尾バイト列のチェックサムを返す。"""
+        start = max(0, size - self.INDEX_ANCHOR_BYTES)
+        with open(self.history_file, "rb") as f:
+            f.seek(start)
+            return zlib.crc32(f.read(size - start))
+
+    def _load_index(self):
+        """サイドカーの索引を読み込む。無い・壊れている場合は何もしない（作り直す）。
+
+        内容が今の履歴ファイルと一致するかは、読み込み後の _index_is_valid で
+        実行中の書き換えと同じ規則により確認する。
+        """
+        try:
+            with open(self.index_file, "rb") as f:
+                data = _loads_line(f.read())
+            indexed_size, anchor, offsets = data["size"], data["anchor"], data["offsets"]
+        except (OSError, ValueError, KeyError, TypeError):
+            return
+        if not (isinstance(indexed_size, int) and indexed_size > 0
+                and isinstance(anchor, int) and _offsets_are_valid(offsets, indexed_size)):
+            return
+        self._offsets = offsets
+        self._indexed_size = self._saved_size = indexed_size
+        self._anchor = anchor
+        self._checked_stat = None  # 必ずチェックサムを照合させる
+
+    def _save_index(self):
+        """索引をサイドカーへ書き出す。書けなければ次回も作り直すだけなので無視する。
+
+        オフセットが狭義単調増加でない索引は壊れているので書き出さない。
+        """
+        with self._index_lock:
+            if not _offsets_are_valid(self._offsets, self._indexed_size):
+                return
+            tmp_path = f"{self.index_file}.tmp"
+            try:
+                data = {
+                    "size": self._indexed_size,
+                    "anchor": self._anchor,
+                    "offsets": self._offsets,
+                }
+                with open(tmp_path, "wb") as f:
+                    f.write(_dumps_line(data))
+                os.replace(tmp_path, self.index_file)
+            except OSError:
+                return
+            self._saved_size = self._indexed_size
+
+    def read_since(self, offset=0):
+        """offset バイト目以降に追記されたエントリと、次回に渡すオフセットを返す。
+
+        追記専用の履歴を末尾から追いかける監視用途向け。改行で終わっていない
+        書き込み途中の行は次回に回す。ファイルが offset より短くなっているか、
+        前回返した offset までの内容が書き換えられていれば作り直されたものと
+        みなし、先頭から読み直す。
+
+        Returns:
+            (エントリのリスト, 次回の offset)
+        """
+        if not os.path.exists(self.history_file):
+            return [], 0
+        with self._index_lock:
+            return self._read_since_locked(offset)
+
+    def _read_since_locked(self, offset):
+        if os.path.getsize(self.history_file) < offset:
+            offset = 0
+        elif offset and self._read_anchor is not None and self._read_anchor[0] == offset:
+            try:
+                if self._index_anchor(offset) != self._read_anchor[1]:
+                    offset = 0
+            except OSError:
+                offset = 0
+
+        entries = []
+        with open(self.history_file, "rb", buffering=1 << 20) as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                offset += len(line)
+                if not line.strip():
+                    continue
+                try:
+                    entries.append(_loads_line(line))
+                except ValueError:
+                    continue  # 壊れた行はスキップ
+            if offset:
+                f.seek(max(0, offset - self.INDEX_ANCHOR_BYTES))
+                self._read_anchor = (offset, zlib.crc32(f.read(min(offset, self.INDEX_ANCHOR_BYTES))))
+        return entries, offset
+
     def get_history(self, preset_name=None):
         """履歴を materialize したリストで返す。REQ-PH-04。"""
         return list(self.iter_history(preset_name))
@@ -46,11 +407,61 @@ class PresetChangeHistory:
         return sum(1 for _ in self.iter_history(preset_name))
 
     def latest_state(self, preset_name=None):
-        """最後のエントリの after 状態を返す。履歴が無ければ None。REQ-PH-05。"""
+        """最後のエントリの after 状態を返す。履歴が無ければ None。REQ-PH-05。
+
+        ファイル全体は読まず、末尾側から該当する最初のエントリを探す。
+        """
+        if not os.path.exists(self.history_file):
+            return None
+        if not isinstance(preset_name, str):
+            for line in self._iter_lines_reversed():
+                if not line.strip():
+                    continue
+                try:
+                    entry = _loads_line(line)
+                except ValueError:
+                    continue
+                if not isinstance(entry, dict):
+                    continue
+                if preset_name is None or entry.get("preset_name") == preset_name:
+                    return entry["after"]
+            return None
+
+        # 索引に未取り込みの末尾（書き込み途中の行を含む）が最新なので先に見る
+        with self._index_lock:
+            self._refresh_offsets()
+            offsets = self._offsets.get(preset_name, ())
+            tail_start = self._indexed_size
         last = None
-        for entry in self.iter_history(preset_name):
+        for entry in self._scan(preset_name, tail_start):
             last = entry
-        return last["after"] if last is not None else None
+        if last is not None:
+            return last["after"]
+        with open(self.history_file, "rb") as f:
+            for offset in reversed(offsets):
+                f.seek(offset)
+                try:
+                    entry = _loads_line(f.readline())
+                except ValueError:
+                    continue
+                if isinstance(entry, dict) and entry.get("preset_name") == preset_name:
+                    return entry["after"]
+        return None
+
+    def _iter_lines_reversed(self, chunk_size=8192):
+        """ファイルの行を末尾から順に返す（改行は含まない）。"""
+        with open(self.history_file, "rb") as f:
+            position = f.seek(0, os.SEEK_END)
+            remainder = b""
+            while position > 0:
+                step = min(chunk_size, position)
+                position -= step
+                f.seek(position)
+                lines = (f.read(step) + remainder).split(b"\n")
+                # 先頭の断片は前のチャンクと繋がる可能性があるので持ち越す
+                remainder = lines[0]
+                yield from reversed(lines[1:])
+            yield remainder
 
     def get_version(self, preset_name, index):
         """時系列 index（負可）の after 状態を返す。履歴無しは IndexError。REQ-PH-06。"""
@@ -77,9 +488,11 @@ class PresetChangeHistory:
         return target
 
     def print_history(self, preset_name=None):
-        for entry in self.iter_history(preset_name):
-            ts = datetime.fromtimestamp(entry["timestamp"], tz=timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
-            print(f"[{ts}] {entry['preset_name']} {entry['change_type']}: {entry.get('note')}")
+        # 行ごとの print 呼び出しを避け、生成した行をまとめて書き出す
+        sys.stdout.writelines(
+            f"[{_format_utc(entry['timestamp'])}] {entry['preset_name']} {entry['change_type']}: {entry.get('note')}\n"
+            for entry in self.iter_history(preset_name)
+        )
 
 if __name__ == "__main__":
     # サンプル利用例
@@ -4,11 +4,19 @@ from __future__ import annotations
 import difflib
 import json
 import logging
+import math
 import webbrowser
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Dict, Iterable, List, Optional, Tuple
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
 BASE_DIR = Path(__file__).resolve().parent
 DEFAULT_REPORT_DIR = BASE_DIR / "diff_reports"
 
@@ -48,8 +56,7 @@ def load_preset(path: str) -> Dict:
         raise FileNotFoundError(f"プリセットファイルが見つかりません: {path}")
 
     try:
-        with preset_path.open(encoding="utf-8") as handle:
-            return json.load(handle)
+        return _loads(preset_path.read_bytes())
     except json.JSONDecodeError as exc:
         logging.error("[ERROR] JSONデコードエラー %s: %s", path, exc)
         raise
@@ -61,7 +68,54 @@ def load_preset(path: str) -> Dict:
         raise
 
 
+def _loads(data: bytes) -> Dict:
+    """JSON をパースする。orjson があれば優先して使う。
+
+    orjson が受け付けない入力（NaN リテラルなど）は標準 json で読み直すため、
+    受理できる内容と送出される例外は json.loads と同じになる。
+    """
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(data.decode("utf-8"))
+
+
+def _renders_like_stdlib(payload: object) -> bool:
+    """orjson の出力が json.dumps(ensure_ascii=False) と一致する値だけで構成されているかを返す。
+
+    orjson は NaN/Infinity を null に、指数表記の float を 1e20 のように（標準 json は
+    1e+20）書き出す。文字列以外のキーは並び順も異なるため、いずれも標準 json に任せる。
+    """
+    stack = [payload]
+    while stack:
+        value = stack.pop()
+        kind = type(value)
+        if kind is dict:
+            for key, item in value.items():
+                if type(key) is not str:
+                    return False
+                stack.append(item)
+        elif kind is list or kind is tuple:
+            stack.extend(value)
+        elif kind is float:
+            if not math.isfinite(value) or "e" in repr(value):
+                return False
+        elif kind not in (str, int, bool) and value is not None:
+            return False
+    return True
+
+
 def _json_lines(payload: Dict, sort_keys: bool) -> List[str]:
+    if ORJSON_AVAILABLE and _renders_like_stdlib(payload):
+        option = orjson.OPT_INDENT_2
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        try:
+            return orjson.dumps(payload, option=option).decode("utf-8").splitlines()
+        except TypeError:
+            pass
     return json.dumps(payload, ensure_ascii=False, indent=2, sort_keys=sort_keys).splitlines()
 
 
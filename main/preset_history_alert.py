@@ -54,23 +54,28 @@ def send_slack_alert(webhook_url: str, message: str) -> bool:
         return False
 
 
+def poll_history(hist: PresetChangeHistory, webhook_url: str, offset: int = 0) -> int:
+    """offset 以降に追記されたエントリを評価して通知し、次回の offset を返す。"""
+    entries, offset = hist.read_since(offset)
+    for entry in entries:
+        msg = evaluate_entry(entry)
+        if msg:
+            send_slack_alert(webhook_url, msg)
+    return offset
+
+
 def monitor_history(history_file: str, webhook_url: str, poll_interval: int = 10) -> None:
     """履歴ファイルを追記順（append-only jsonl）に監視し、新規異常を通知する。
 
-    インデックス（処理済み件数）で進捗を管理するため、長時間稼働でも
-    メモリ使用量は一定（旧実装は seen セットが無制限に増加していた）。
+    処理済み位置をバイトオフセットで管理し、毎回追記分だけを読むため、
+    履歴が伸びてもポーリング1回あたりのコストとメモリ使用量は一定。
     """
     print(f"プリセット履歴監視開始: {history_file}")
     hist = PresetChangeHistory(history_file)
-    seen_count = 0
+    offset = 0
     while True:
         try:
-            entries = hist.get_history()
-            for entry in entries[seen_count:]:
-                msg = evaluate_entry(entry)
-                if msg:
-                    send_slack_alert(webhook_url, msg)
-            seen_count = len(entries)
+            offset = poll_history(hist, webhook_url, offset)
         except Exception as e:
             print(f"履歴監視エラー: {e}")
         time.sleep(poll_interval)
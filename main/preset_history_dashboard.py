@@ -1,7 +1,7 @@
 from collections import Counter
 from datetime import datetime
 
-from flask import Flask, render_template_string, request
+from flask import Flask, request
 from preset_change_history import PresetChangeHistory
 
 app = Flask(__name__)
@@ -42,12 +42,16 @@ def dt_filter(ts):
 
 app.jinja_env.filters['dt'] = dt_filter
 
+# render_template_string はリクエストごとにテンプレートを解析・コンパイルし直すため、
+# フィルタ登録後に一度だけコンパイルして使い回す
+DASHBOARD_TEMPLATE = app.jinja_env.from_string(TEMPLATE)
+
 @app.route('/', methods=['GET'])
 def dashboard():
     preset = request.args.get('preset', '')
     entries = list(HIST.iter_history(preset)) if preset else []
     stats = Counter(e['change_type'] for e in entries)
-    return render_template_string(TEMPLATE, preset=preset, entries=entries, stats=stats)
+    return DASHBOARD_TEMPLATE.render(preset=preset, entries=entries, stats=stats)
 
 if __name__ == '__main__':
     app.run(debug=True, port=5002)
@@ -1,4 +1,5 @@
 import argparse
+import bisect
 import json
 from datetime import datetime
 
@@ -7,6 +8,9 @@ from preset_change_history import PresetChangeHistory
 
 _MISSING = object()
 
+# index 未指定でエントリ数がこれ未満なら、ソートせずに線形探索する
+_LINEAR_SEARCH_MAX = 32
+
 
 def diff_dict(d1, d2, prefix=""):
     """dict 差分を返す。ネストした dict は再帰し、ドット区切りのパスで表示する。
@@ -14,33 +18,53 @@ def diff_dict(d1, d2, prefix=""):
     返り値: ["path: v1 -> v2", ...]（変更箇所のみ）。フラットな dict では従来と同じ出力。
     Missing key と明示的 None 値を区別する。
     """
-    diffs = []
-    keys = set(d1.keys()) | set(d2.keys())
-    for k in sorted(keys, key=str):
-        path = f"{prefix}{k}"
-        v1 = d1[k] if k in d1 else _MISSING
-        v2 = d2[k] if k in d2 else _MISSING
-        if v1 is _MISSING:
-            diffs.append(f"{path}: <missing> -> {v2}")
-        elif v2 is _MISSING:
-            diffs.append(f"{path}: {v1} -> <missing>")
+    changed = []  # (key, 差分行のリスト)。変更のあったキーだけを集めてから並べる
+    for k, v1 in d1.items():
+        v2 = d2.get(k, _MISSING)
+        if v2 is _MISSING:
+            changed.append((k, [f"{prefix}{k}: {v1} -> <missing>"]))
         elif isinstance(v1, dict) and isinstance(v2, dict):
-            diffs.extend(diff_dict(v1, v2, prefix=f"{path}."))
+            nested = diff_dict(v1, v2, prefix=f"{prefix}{k}.")
+            if nested:
+                changed.append((k, nested))
         elif v1 != v2:
-            diffs.append(f"{path}: {v1} -> {v2}")
-    return diffs
+            changed.append((k, [f"{prefix}{k}: {v1} -> {v2}"]))
+    for k, v2 in d2.items():
+        if k not in d1:
+            changed.append((k, [f"{prefix}{k}: <missing> -> {v2}"]))
+    changed.sort(key=lambda item: str(item[0]))
+    return [line for _, lines in changed for line in lines]
+
+def build_time_index(entries):
+    """timestamp 昇順に並べた (timestamps, entries) を返す。
+
+    timestamp を持たないエントリは除外する。安定ソートなので同時刻のエントリは
+    元の順序を保つ。find_entry_by_time に渡すと二分探索で検索できる。
+    """
+    timed = [e for e in entries if isinstance(e.get("timestamp"), (int, float))]
+    timed.sort(key=lambda e: e["timestamp"])
+    return [e["timestamp"] for e in timed], timed
 
-def find_entry_by_time(entries, ts):
+def find_entry_by_time(entries, ts, index=None):
     # ts: 'YYYY-mm-dd HH:MM:SS' 形式。timestamp を持たないエントリはスキップ。
+    # 複数回検索する場合は build_time_index の結果を index に渡して使い回す。
     target = datetime.strptime(ts, "%Y-%m-%d %H:%M:%S").timestamp()
-    closest = None
-    for e in entries:
-        et = e.get("timestamp")
-        if not isinstance(et, (int, float)):
-            continue
-        if closest is None or abs(et - target) < abs(closest["timestamp"] - target):
-            closest = e
-    return closest
+    if index is None and len(entries) < _LINEAR_SEARCH_MAX:
+        timed = [e for e in entries if isinstance(e.get("timestamp"), (int, float))]
+        if not timed:
+            return None
+        timestamps = [e["timestamp"] for e in timed]
+        return timed[min(range(len(timestamps)), key=lambda i: abs(timestamps[i] - target))]
+    timestamps, timed = index if index is not None else build_time_index(entries)
+    if not timed:
+        return None
+    i = bisect.bisect_left(timestamps, target)
+    if i == len(timestamps):
+        i -= 1
+    elif i > 0 and target - timestamps[i - 1] <= timestamps[i] - target:
+        i -= 1
+    # 同時刻のエントリが並ぶ場合は先頭のものを返す
+    return timed[bisect.bisect_left(timestamps, timestamps[i])]
 
 def main():
     parser = argparse.ArgumentParser(description="プリセット履歴差分比較・ロールバック")
@@ -52,9 +76,10 @@ def main():
     args = parser.parse_args()
     hist = PresetChangeHistory()
     entries = list(hist.iter_history(args.preset))
+    index = build_time_index(entries)
     if args.from_time and args.to_time:
-        e1 = find_entry_by_time(entries, args.from_time)
-        e2 = find_entry_by_time(entries, args.to_time)
+        e1 = find_entry_by_time(entries, args.from_time, index)
+        e2 = find_entry_by_time(entries, args.to_time, index)
         if not e1 or not e2:
             print("指定時刻の履歴が見つかりません")
             return
@@ -62,7 +87,7 @@ def main():
         for diff in diff_dict(e1['after'], e2['after']):
             print(diff)
     elif args.rollback:
-        e = find_entry_by_time(entries, args.rollback)
+        e = find_entry_by_time(entries, args.rollback, index)
         if not e:
             print("指定時刻の履歴が見つかりません")
             return
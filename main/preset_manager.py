@@ -1,8 +1,9 @@
 import copy
 import json
 import logging
+import os
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Set
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
 
 try:
     from logging_manager import Logger
@@ -10,6 +11,27 @@ except ImportError:
     Logger = logging.Logger
 from collections import defaultdict
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+
+def _loads(data: bytes) -> Any:
+    """JSON をパースする。orjson があれば優先して使う。
+
+    orjson が受け付けない入力（NaN リテラルなど）は標準 json で読み直すため、
+    受理できる内容は json.load と同じになる。
+    """
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(data.decode('utf-8'))
+
 
 class PresetError(Exception):
     """プリセット操作に関するエラー。"""
@@ -18,6 +40,9 @@ class PresetError(Exception):
 class PresetManager:
     """Manage and manipulate presets"""
 
+    # search_presets の結果を保持するクエリ数の上限（超えたら一旦すべて破棄する）
+    SEARCH_RESULT_CACHE_SIZE = 256
+
     def __init__(self, logger: Logger, preset_dir: str = "presets"):
         """Initialize preset manager"""
         self.logger = logger
@@ -25,6 +50,12 @@ class PresetManager:
         self.presets: Dict[str, Dict[str, Any]] = {}
         self._index: Dict[str, Set[str]] = defaultdict(set)  # 検索インデックス
         self._tags_index: Dict[str, List[str]] = defaultdict(list)  # タグベースのインデックス
+        # 検索用の小文字化済み (テキスト, プリセット名群) 一覧。インデックス変更時に破棄する
+        self._search_entries: Optional[List[Tuple[str, Iterable[str]]]] = None
+        # 小文字化済みクエリ -> 検索結果。繰り返し同じ語で検索された場合に走査を省く
+        self._search_results: Dict[str, Tuple[str, ...]] = {}
+        # プリセット名 -> 読み込み時のファイルの (mtime_ns, size)。変化の無いファイルは再読込しない
+        self._preset_mtimes: Dict[str, Tuple[int, int]] = {}
 
     def load_presets(self) -> None:
         """Load all available presets"""
@@ -33,15 +64,30 @@ class PresetManager:
                 self.logger.warning(f"Preset directory not found: {self.preset_dir}")
                 return
 
-            self.presets.clear()
-            self._index.clear()
-            self._tags_index.clear()
-
-            for preset_file in self.preset_dir.glob("*.json"):
-                preset_name = preset_file.stem
-                preset_data = self._load_preset(preset_file)
+            with os.scandir(self.preset_dir) as it:
+                current = {
+                    Path(entry.name).stem: entry
+                    for entry in it
+                    if entry.name.endswith(".json") and entry.is_file()
+                }
+
+            # ディレクトリから消えたプリセットをキャッシュとインデックスから外す
+            for preset_name in [name for name in self.presets if name not in current]:
+                self._remove_from_index(preset_name, self.presets.pop(preset_name))
+                self._preset_mtimes.pop(preset_name, None)
+
+            for preset_name, entry in current.items():
+                st = entry.stat()
+                signature = (st.st_mtime_ns, st.st_size)
+                if self._preset_mtimes.get(preset_name) == signature and preset_name in self.presets:
+                    continue  # 前回の読み込みから変更されていない
+
+                preset_data = self._load_preset(Path(entry.path))
+                if preset_name in self.presets:
+                    self._remove_from_index(preset_name, self.presets[preset_name])
                 self.presets[preset_name] = preset_data
                 self._update_index(preset_name, preset_data)
+                self._preset_mtimes[preset_name] = signature
 
             self.logger.info(f"Loaded {len(self.presets)} presets")
 
@@ -52,8 +98,7 @@ class PresetManager:
     def _load_preset(self, preset_file: Path) -> Dict[str, Any]:
         """Load a single preset"""
         try:
-            with open(preset_file, encoding='utf-8') as f:
-                preset_data = json.load(f)
+            preset_data = _loads(preset_file.read_bytes())
 
             # Validate preset data
             self._validate_preset(preset_data)
@@ -65,6 +110,8 @@ class PresetManager:
 
     def _update_index(self, preset_name: str, preset_data: Dict[str, Any]) -> None:
         """プリセットのインデックスを更新"""
+        self._invalidate_search_cache()
+
         # パラメータ名によるインデックス
         for param_name in preset_data.get('parameters', {}):
             self._index[param_name].add(preset_name)
@@ -83,25 +130,42 @@ class PresetManager:
             return list(self.presets.keys())
 
         q = query.lower()
-        matching_presets = set()
-
-        # パラメータ名による検索
-        for param_name in self._index:
-            if q in param_name.lower():
-                matching_presets.update(self._index[param_name])
+        cached = self._search_results.get(q)
+        if cached is not None:
+            return list(cached)
 
-        # タグによる検索 (_tags_index was built but previously not queried)
-        for tag_name in self._tags_index:
-            if q in tag_name.lower():
-                matching_presets.update(self._tags_index[tag_name])
-
-        # プリセット名による検索
-        for preset_name in self.presets:
-            if q in preset_name.lower():
-                matching_presets.add(preset_name)
+        matching_presets = set()
+        for text, names in self._get_search_entries():
+            if q in text:
+                matching_presets.update(names)
 
+        if len(self._search_results) >= self.SEARCH_RESULT_CACHE_SIZE:
+            self._search_results.clear()
+        self._search_results[q] = tuple(matching_presets)
         return list(matching_presets)
 
+    def _invalidate_search_cache(self) -> None:
+        """インデックス変更時に検索用の派生キャッシュを破棄する"""
+        self._search_entries = None
+        self._search_results.clear()
+
+    def _get_search_entries(self) -> List[Tuple[str, Iterable[str]]]:
+        """パラメータ名・タグ・プリセット名を小文字化した検索用一覧を返す
+
+        クエリごとに全キーを lower() し直さないよう、インデックスが
+        変わるまで結果を使い回す。
+        """
+        if self._search_entries is None:
+            entries: List[Tuple[str, Iterable[str]]] = []
+            # パラメータ名による検索
+            entries.extend((name.lower(), presets) for name, presets in self._index.items())
+            # タグによる検索
+            entries.extend((tag.lower(), presets) for tag, presets in self._tags_index.items())
+            # プリセット名による検索
+            entries.extend((name.lower(), (name,)) for name in self.presets)
+            self._search_entries = entries
+        return self._search_entries
+
     def batch_update_presets(self, updates: Dict[str, Dict[str, Any]]) -> Dict[str, bool]:
         """複数のプリセットをバッチ更新"""
         results = {}
@@ -165,6 +229,8 @@ class PresetManager:
             cached = copy.deepcopy(preset_data)
             self.presets[preset_name] = cached
             self._update_index(preset_name, cached)
+            st = preset_file.stat()
+            self._preset_mtimes[preset_name] = (st.st_mtime_ns, st.st_size)
 
             self.logger.info(f"Saved preset: {preset_name}")
 
@@ -181,6 +247,7 @@ class PresetManager:
                 self.logger.info(f"Deleted preset: {preset_name}")
 
                 # Remove from cache and index
+                self._preset_mtimes.pop(preset_name, None)
                 if preset_name in self.presets:
                     preset_data = self.presets[preset_name]
                     del self.presets[preset_name]
@@ -202,6 +269,8 @@ class PresetManager:
 
     def _remove_from_index(self, preset_name: str, preset_data: Dict[str, Any]) -> None:
         """プリセットをインデックスから削除"""
+        self._invalidate_search_cache()
+
         # パラメータ名によるインデックスから削除。
         # self._index は defaultdict なので、未登録の param_name を [] で
         # 読むと空 set が新規生成されて残留する（メモリリーク + インデックス
@@ -242,21 +311,22 @@ class PresetManager:
     def compare_presets(self, preset1: str, preset2: str) -> Dict[str, Any]:
         """Compare two presets"""
         try:
-            p1 = self.get_preset(preset1)
-            p2 = self.get_preset(preset2)
+            # Read the cached dicts directly; only the differing values that
+            # are handed back to the caller need copying.
+            p1 = self.presets.get(preset1)
+            p2 = self.presets.get(preset2)
 
             if not p1 or not p2:
                 raise PresetError("One or both presets not found")
 
-            differences = {}
-            all_keys = set(p1.keys()).union(p2.keys())
-
-            for key in all_keys:
-                if p1.get(key) != p2.get(key):
-                    differences[key] = {
-                        'preset1': p1.get(key),
-                        'preset2': p2.get(key)
-                    }
+            differences = {
+                key: {
+                    'preset1': copy.deepcopy(v1),
+                    'preset2': copy.deepcopy(v2)
+                }
+                for key in p1.keys() | p2.keys()
+                if (v1 := p1.get(key)) != (v2 := p2.get(key))
+            }
 
             self.logger.info(f"Found {len(differences)} differences between presets")
             return {
@@ -272,16 +342,16 @@ class PresetManager:
     def merge_presets(self, base_preset: str, update_preset: str) -> Dict[str, Any]:
         """Merge two presets, with update_preset taking precedence"""
         try:
-            base = self.get_preset(base_preset)
-            update = self.get_preset(update_preset)
+            base = self.presets.get(base_preset)
+            update = self.presets.get(update_preset)
 
             if not base or not update:
                 raise PresetError("One or both presets not found")
 
-            # Merge parameters
-            merged = base.copy()
-            for key, value in update.items():
-                merged[key] = value
+            # Merge parameters, then deep copy once so the result shares no
+            # nested objects with the cache (values shadowed by update_preset
+            # are never copied)
+            merged = copy.deepcopy({**base, **update})
 
             self.logger.info(f"Merged presets: {base_preset} and {update_preset}")
             return merged
@@ -1,15 +1,43 @@
-import glob
+import itertools
 import json
 import logging
 import os
 import shutil
 import time
 from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from typing import Any, Deque, Dict, Optional
 
 from performance_monitor import PerformanceMonitor
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+
+def _loads(data):
+    """JSON をパースする。orjson があれば優先し、受理できない入力は標準 json で読み直す。"""
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(data.decode("utf-8"))
+
+
+def _canonical(data):
+    """修復前後の比較に使う、キー順を揃えた直列化結果を返す。"""
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.dumps(data, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            pass
+    return json.dumps(data, ensure_ascii=False, sort_keys=True).encode("utf-8")
+
 
 class PresetPerformanceMonitor:
     """プリセット操作のパフォーマンス監視"""
@@ -21,18 +49,24 @@ class PresetPerformanceMonitor:
             "preset_operation_threshold": 1000,  # ms
         })
         self.operation_stats: Dict[str, Any] = {}
+        # 所要時間計測用の単調増加カウンタ（ns）。壁時計の補正の影響を受けない
+        self._start_ns: Dict[str, int] = {}
         self._op_history: Dict[str, Deque[Dict[str, Any]]] = {}
         self._history_maxlen: int = 100
+        # 同時刻に開始した操作（並列実行時）でも ID が衝突しないよう連番を付ける
+        self._op_seq = itertools.count()
         self.logger = logging.getLogger(__name__)
 
     def start_operation(self, operation_name: str) -> str:
         """操作の開始を記録"""
-        operation_id = f"{operation_name}_{time.time()}"
+        start_time = time.time()
+        operation_id = f"{operation_name}_{start_time}_{next(self._op_seq)}"
         self.operation_stats[operation_id] = {
             "operation": operation_name,
-            "start_time": time.time(),
+            "start_time": start_time,
             "status": "running"
         }
+        self._start_ns[operation_id] = time.perf_counter_ns()
         return operation_id
 
     def end_operation(self, operation_id: str, success: bool = True, metadata: Optional[Dict[str, Any]] = None) -> None:
@@ -42,7 +76,11 @@ class PresetPerformanceMonitor:
 
         stats = self.operation_stats[operation_id]
         end_time = time.time()
-        duration = (end_time - stats["start_time"]) * 1000  # ms
+        start_ns = self._start_ns.pop(operation_id, None)
+        if start_ns is not None:
+            duration = (time.perf_counter_ns() - start_ns) / 1_000_000  # ms
+        else:
+            duration = (end_time - stats["start_time"]) * 1000  # ms
 
         stats.update({
             "end_time": end_time,
@@ -55,14 +93,13 @@ class PresetPerformanceMonitor:
         threshold = self.performance_monitor.config.get("preset_operation_threshold", 1000)
         if duration > threshold:
             self.logger.warning(
-                f"プリセット操作が遅いです: {stats['operation']} ({duration:.2f}ms > {threshold}ms)"
+                "プリセット操作が遅いです: %s (%.2fms > %sms)", stats["operation"], duration, threshold
             )
 
         # 統計収集 (own history — do not mutate PerformanceMonitor internals)
         op_name = stats["operation"]
-        if op_name not in self._op_history:
-            self._op_history[op_name] = deque(maxlen=self._history_maxlen)
-        self._op_history[op_name].append({"timestamp": stats["start_time"], "value": duration})
+        history = self._op_history.setdefault(op_name, deque(maxlen=self._history_maxlen))
+        history.append({"timestamp": stats["start_time"], "value": duration})
 
     def get_performance_report(self) -> Dict[str, Any]:
         """パフォーマンスレポートを取得"""
@@ -85,12 +122,18 @@ class PresetPerformanceMonitor:
             ],
         }
 
-def backup_file(filepath, backup_dir):
+def backup_file(filepath, backup_dir, ts=None):
+    # ts: 一括処理ではバッチ単位で一度だけ求めた時刻文字列を渡す
     os.makedirs(backup_dir, exist_ok=True)
     base = os.path.basename(filepath)
-    ts = datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')
+    if ts is None:
+        ts = datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')
     backup_path = os.path.join(backup_dir, f"{base}.{ts}.bak")
-    shutil.copy2(filepath, backup_path)
+    # プリセットは権限や拡張属性を引き継ぐ必要が無いため、copy2 ではなく
+    # 内容のコピーと更新時刻の引き継ぎだけを行う
+    st = os.stat(filepath)
+    shutil.copyfile(filepath, backup_path)
+    os.utime(backup_path, ns=(st.st_atime_ns, st.st_mtime_ns))
     return backup_path
 
 def repair_preset(data):
@@ -103,31 +146,60 @@ def repair_preset(data):
         data["parameters"] = []
     return data
 
-def validate_and_repair_dir(target_dir, backup_dir="preset_backups", report_path=None):
-    """ディレクトリ内の全プリセットJSONを検証し、必要に応じて自動修復する。"""
+def _list_preset_files(target_dir):
+    """target_dir 直下のプリセットJSONのパスを返す。ディレクトリが無ければ空。
+
+    DirEntry はディレクトリ読み出し時の種別情報を持つため、ファイルごとの
+    stat を追加で発行しない。glob と同様にドットで始まる名前は除外する。
+    """
+    try:
+        with os.scandir(target_dir) as it:
+            return [
+                e.path for e in it
+                if e.name.endswith(".json") and not e.name.startswith(".") and e.is_file()
+            ]
+    except (FileNotFoundError, NotADirectoryError):
+        return []
+
+def _validate_and_repair_file(filepath, backup_dir, ts, monitor):
+    """1ファイルを検証・修復してレポート行を返す。"""
+    op_id = monitor.start_operation("validate_and_repair")
+    entry = {"file": filepath, "repaired": False, "error": None}
+    try:
+        with open(filepath, "rb") as f:
+            data = _loads(f.read())
+
+        original = _canonical(data)
+        repaired = repair_preset(data)
+        if _canonical(repaired) != original:
+            entry["backup"] = backup_file(filepath, backup_dir, ts)
+            with open(filepath, "w", encoding="utf-8") as f:
+                json.dump(repaired, f, ensure_ascii=False, indent=2)
+            entry["repaired"] = True
+        monitor.end_operation(op_id, success=True)
+    except (OSError, json.JSONDecodeError) as e:
+        entry["error"] = str(e)
+        monitor.end_operation(op_id, success=False)
+    return entry
+
+def validate_and_repair_dir(target_dir, backup_dir="preset_backups", report_path=None, max_workers=None):
+    """ディレクトリ内の全プリセットJSONを検証し、必要に応じて自動修復する。
+
+    ファイルごとの処理は独立しているためスレッドプールで並列に行う。
+    レポートの順序はファイル一覧の順序を保つ。
+    """
     monitor = PresetPerformanceMonitor()
-    preset_files = glob.glob(os.path.join(target_dir, "*.json"))
-    reports = []
+    preset_files = _list_preset_files(target_dir)
+    ts = datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')
 
-    for filepath in preset_files:
-        op_id = monitor.start_operation("validate_and_repair")
-        entry = {"file": filepath, "repaired": False, "error": None}
-        try:
-            with open(filepath, encoding="utf-8") as f:
-                data = json.load(f)
-
-            original = json.dumps(data, ensure_ascii=False, sort_keys=True)
-            repaired = repair_preset(data)
-            if json.dumps(repaired, ensure_ascii=False, sort_keys=True) != original:
-                entry["backup"] = backup_file(filepath, backup_dir)
-                with open(filepath, "w", encoding="utf-8") as f:
-                    json.dump(repaired, f, ensure_ascii=False, indent=2)
-                entry["repaired"] = True
-            monitor.end_operation(op_id, success=True)
-        except (OSError, json.JSONDecodeError) as e:
-            entry["error"] = str(e)
-            monitor.end_operation(op_id, success=False)
-        reports.append(entry)
+    def process(filepath):
+        return _validate_and_repair_file(filepath, backup_dir, ts, monitor)
+
+    if len(preset_files) <= 1 or max_workers == 1:
+        reports = [process(filepath) for filepath in preset_files]
+    else:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            reports = list(executor.map(process, preset_files))
 
     if report_path:
         with open(report_path, "w", encoding="utf-8") as f:
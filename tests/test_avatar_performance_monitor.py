@@ -1,7 +1,11 @@
 """Tests for AvatarPerformanceMonitor — metrics, stats, health."""
+import asyncio
 import os
+import sqlite3
 import sys
 import unittest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'main'))
 from avatar_performance_monitor import (
@@ -14,7 +18,6 @@ from avatar_performance_monitor import (
 class TestAvatarPerformanceMetrics(unittest.TestCase):
 
     def test_basic_creation(self):
-        from datetime import datetime, timezone
         m = AvatarPerformanceMetrics(
             operation_type="render",
             user_id="u1",
@@ -25,7 +28,6 @@ class TestAvatarPerformanceMetrics(unittest.TestCase):
         self.assertEqual(m.user_id, "u1")
 
     def test_success_defaults_false(self):
-        from datetime import datetime, timezone
         m = AvatarPerformanceMetrics(
             operation_type="render",
             user_id="u1",
@@ -65,6 +67,27 @@ class TestAvatarPerformanceMonitorInit(unittest.TestCase):
     def test_stats_cache_starts_empty(self):
         self.assertEqual(len(self.monitor.stats_cache), 0)
 
+    def test_monitoring_loop_reuses_one_event_loop(self):
+        loops = []
+
+        async def record_loop():
+            loops.append(asyncio.get_running_loop())
+
+        def stop_after_two_ticks(_seconds):
+            if len(loops) >= 4:
+                self.monitor.is_monitoring = False
+
+        with patch.object(self.monitor, "_check_operation_timeouts"), \
+             patch.object(self.monitor, "_cleanup_old_data"), \
+             patch.object(self.monitor, "_update_performance_stats", record_loop), \
+             patch.object(self.monitor, "_check_alert_conditions", record_loop), \
+             patch("avatar_performance_monitor.time.sleep", side_effect=stop_after_two_ticks):
+            self.monitor._monitoring_loop()
+
+        self.assertEqual(len(loops), 4)
+        self.assertEqual(len({id(loop) for loop in loops}), 1)
+        self.assertTrue(loops[0].is_closed())
+
 
 class TestAvatarPerformanceMonitorTracking(unittest.IsolatedAsyncioTestCase):
 
@@ -103,3 +126,63 @@ class TestAvatarPerformanceMonitorTracking(unittest.IsolatedAsyncioTestCase):
 
     async def test_end_nonexistent_operation_no_error(self):
         await self.monitor.end_operation_tracking("nonexistent_op_id", success=True)
+
+    async def test_timeout_check_saves_inside_running_loop(self):
+        op_id = await self.monitor.start_operation_tracking("render", "user1", "avatar1")
+        self.monitor.active_operations[op_id].start_time = (
+            datetime.now(timezone.utc) - timedelta(hours=1)
+        )
+        self.monitor._check_operation_timeouts()
+        self.assertNotIn(op_id, self.monitor.active_operations)
+        with sqlite3.connect(str(self.monitor.db_path)) as conn:
+            count = conn.execute("SELECT COUNT(*) FROM avatar_performance").fetchone()[0]
+        self.assertEqual(count, 1)
+
+    async def test_timeout_check_saves_all_expired_in_one_batch(self):
+        past = datetime.now(timezone.utc) - timedelta(hours=1)
+        for user in ("user1", "user2", "user3"):
+            op_id = await self.monitor.start_operation_tracking("render", user, f"op_{user}")
+            self.monitor.active_operations[op_id].start_time = past
+        real_connect = sqlite3.connect
+        with patch("avatar_performance_monitor.sqlite3.connect", side_effect=real_connect) as connect:
+            self.monitor._check_operation_timeouts()
+        self.assertEqual(connect.call_count, 1)
+        with sqlite3.connect(str(self.monitor.db_path)) as conn:
+            count = conn.execute("SELECT COUNT(*) FROM avatar_performance").fetchone()[0]
+        self.assertEqual(count, 3)
+        self.assertEqual(len(self.monitor.active_operations), 0)
+
+    async def test_timeout_check_same_user_same_second_keeps_other_ops(self):
+        past = (datetime.now(timezone.utc) - timedelta(hours=1)).replace(microsecond=0)
+        for op_id, user in (("a", "user1"), ("b", "user1"), ("c", "user2")):
+            await self.monitor.start_operation_tracking("render", user, op_id)
+            self.monitor.active_operations[op_id].start_time = past
+        self.monitor._check_operation_timeouts()
+        with sqlite3.connect(str(self.monitor.db_path)) as conn:
+            users = sorted(r[0] for r in conn.execute("SELECT user_id FROM avatar_performance"))
+        self.assertEqual(users, ["user1", "user2"])
+        self.assertEqual(len(self.monitor.active_operations), 0)
+
+    async def test_timeout_check_alerts_once_and_retries_save(self):
+        op_id = await self.monitor.start_operation_tracking("render", "user1", "avatar1")
+        self.monitor.active_operations[op_id].start_time = (
+            datetime.now(timezone.utc) - timedelta(hours=1)
+        )
+        with patch.object(self.monitor, "_write_performance_metrics",
+                          side_effect=sqlite3.OperationalError("database is locked")):
+            for _ in range(2):
+                with self.assertRaises(sqlite3.OperationalError):
+                    self.monitor._check_operation_timeouts()
+        self.assertNotIn(op_id, self.monitor.active_operations)
+        self.assertIn(op_id, self.monitor.pending_timeouts)
+        self.assertEqual(len(self.monitor.alert_queue), 1)
+
+        self.monitor._check_operation_timeouts()
+        self.assertEqual(self.monitor.pending_timeouts, {})
+        self.assertEqual(len(self.monitor.alert_queue), 1)
+        with sqlite3.connect(str(self.monitor.db_path)) as conn:
+            count = conn.execute("SELECT COUNT(*) FROM avatar_performance").fetchone()[0]
+        self.assertEqual(count, 1)
+
+    def test_write_without_metrics_is_noop(self):
+        self.monitor._write_performance_metrics()
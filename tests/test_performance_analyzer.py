@@ -130,6 +130,10 @@ class TestAnalyzePerformanceWithData(unittest.TestCase):
         result = self.analyzer._analyze_cpu()
         self.assertAlmostEqual(result['max_usage'], 50.0)
 
+    def test_percent_summary_single_pass(self):
+        samples = [{'percent': 20.0}, {'percent': 70.0}, {'percent': 30.0}]
+        self.assertEqual(self.analyzer._percent_summary(samples), (40.0, 70.0))
+
     def test_memory_analysis_keys(self):
         result = self.analyzer._analyze_memory()
         self.assertIn('average_usage', result)
@@ -204,6 +208,39 @@ class TestCollectMetricsMocked(unittest.TestCase):
         self.assertAlmostEqual(self.analyzer.metrics['cpu'][0]['percent'], 25.0)
         self.assertEqual(self.analyzer.metrics['cpu'][0]['count'], 8)
 
+    def test_collect_metrics_does_not_block_and_caches_cpu_count(self):
+        with patch('performance_analyzer.PSUTIL_AVAILABLE', True), \
+             patch('performance_analyzer.psutil') as mock_psutil:
+            mock_psutil.cpu_percent.return_value = 10.0
+            mock_psutil.cpu_count.return_value = 4
+            mock_psutil.virtual_memory.return_value = MagicMock(total=1, used=1, percent=1.0)
+            mock_psutil.disk_usage.return_value = MagicMock(total=1, used=1, percent=1.0)
+            mock_psutil.net_io_counters.return_value = MagicMock(bytes_sent=0, bytes_recv=0)
+
+            self.analyzer._collect_metrics()
+            self.analyzer._collect_metrics()
+
+            mock_psutil.cpu_percent.assert_called_with(interval=None)
+            mock_psutil.cpu_count.assert_called_once_with()
+        self.assertEqual([item['count'] for item in self.analyzer.metrics['cpu']], [4, 4])
+
+
+class TestHistoryLimit(unittest.TestCase):
+    """Tests for bounded metric history."""
+
+    def test_history_is_trimmed_to_limit(self):
+        analyzer = PerformanceAnalyzer(logging.getLogger("test_performance_analyzer"), history_limit=3)
+        for i in range(6):
+            analyzer._append_sample('cpu', {'percent': float(i)})
+        self.assertEqual([item['percent'] for item in analyzer.metrics['cpu']], [3.0, 4.0, 5.0])
+
+    def test_history_never_exceeds_twice_limit(self):
+        analyzer = PerformanceAnalyzer(logging.getLogger("test_performance_analyzer"), history_limit=10)
+        for i in range(100):
+            analyzer._append_sample('memory', {'percent': float(i)})
+            self.assertLess(len(analyzer.metrics['memory']), 20)
+        self.assertEqual(analyzer.metrics['memory'][-1]['percent'], 99.0)
+
 
 if __name__ == "__main__":
     unittest.main()
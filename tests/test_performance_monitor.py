@@ -4,16 +4,19 @@ Spec: docs/SPEC_PERFORMANCE_MONITOR.md (REQ-PM-01..02)
 Runnable without pytest:  python3 -m unittest tests.test_performance_monitor -v
 """
 import asyncio
+import copy
+import pickle
 import sys
 import unittest
 from pathlib import Path
+from unittest.mock import patch
 
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 for p in (str(PROJECT_ROOT), str(PROJECT_ROOT / "main")):
     if p not in sys.path:
         sys.path.insert(0, p)
 
-from performance_monitor import PerformanceMonitor
+from performance_monitor import MetricRing, PerformanceMonitor
 
 
 class TestPerformanceMonitorCreation(unittest.TestCase):
@@ -67,6 +70,17 @@ class TestUtcTimestamps(unittest.TestCase):
         self.assertGreater(len(result), 0)
 
 
+class TestMessages(unittest.TestCase):
+    def test_language_table_is_used(self):
+        pm = PerformanceMonitor({"language": "en"})
+        self.assertEqual(pm._get_message("monitoring_started"), "Performance monitoring started")
+
+    def test_unknown_language_falls_back_to_japanese(self):
+        pm = PerformanceMonitor({"language": "xx"})
+        self.assertEqual(pm._get_message("monitoring_started"), "パフォーマンス監視を開始しました")
+        self.assertEqual(pm._get_message("no_such_key"), "no_such_key")
+
+
 class TestValidateConfig(unittest.TestCase):
     def test_validate_config_returns_dict(self):
         pm = PerformanceMonitor()
@@ -121,6 +135,127 @@ class TestGetPerformanceReport(unittest.TestCase):
         report = pm.get_performance_report()
         self.assertIsInstance(report["custom_metrics"], dict)
 
+    def test_history_summary_matches_statistics(self):
+        import statistics
+        pm = PerformanceMonitor()
+        values = [12.5, 3.0, 47.25, 8.0, 19.5, 3.0]
+        for i, value in enumerate(values):
+            pm.metrics_history["cpu"].push(value, float(i))
+        summary = pm.get_performance_report()["history"]["cpu"]
+        self.assertEqual(summary["min"], min(values))
+        self.assertEqual(summary["max"], max(values))
+        self.assertAlmostEqual(summary["avg"], statistics.mean(values))
+        self.assertAlmostEqual(summary["std_dev"], statistics.stdev(values))
+        self.assertEqual(summary["latest"], values[-1])
+        self.assertEqual(summary["median"], sorted(values)[len(values) // 2])
+
+    def test_history_summary_percentiles(self):
+        pm = PerformanceMonitor({"history_size": 200})
+        for i in range(200):
+            pm.metrics_history["memory"].push(float(199 - i), float(i))
+        summary = pm.get_performance_report()["history"]["memory"]
+        self.assertEqual(summary["p95"], 190.0)
+        self.assertEqual(summary["p99"], 198.0)
+
+
+class TestExportMetrics(unittest.TestCase):
+    def test_export_writes_readable_json(self):
+        import json
+        import os
+        import tempfile
+        pm = PerformanceMonitor({"language": "ja"})
+        pm.metrics_history["cpu"].append({"timestamp": "2026-01-01T00:00:00+00:00", "value": 12.5})
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "metrics.json")
+            self.assertTrue(pm.export_metrics(path))
+            with open(path, encoding="utf-8") as fp:
+                data = json.load(fp)
+        self.assertEqual(data["history"]["cpu"], [{"timestamp": "2026-01-01T00:00:00+00:00", "value": 12.5}])
+        self.assertEqual(data["config"], {"language": "ja"})
+
+
+def _iso(epoch):
+    from datetime import datetime, timezone
+    return datetime.fromtimestamp(epoch, timezone.utc).isoformat()
+
+
+class TestMetricRing(unittest.TestCase):
+    def test_wraps_and_keeps_chronological_order(self):
+        ring = MetricRing(3)
+        for i in range(5):
+            ring.push(float(i), float(i))
+        self.assertEqual(len(ring), 3)
+        self.assertEqual(list(ring.values()), [2.0, 3.0, 4.0])
+        self.assertEqual([s["timestamp"] for s in ring], [_iso(2), _iso(3), _iso(4)])
+        self.assertEqual(ring.recent(2), [
+            {"timestamp": _iso(3), "value": 3.0},
+            {"timestamp": _iso(4), "value": 4.0},
+        ])
+
+    def test_append_treats_naive_iso_timestamp_as_utc(self):
+        ring = MetricRing(3)
+        ring.append({"timestamp": "2024-01-01T12:00:00", "value": 1.0})
+        ring.append({"timestamp": "2024-01-01T12:00:00+09:00", "value": 2.0})
+        self.assertEqual([s["timestamp"] for s in ring], [
+            "2024-01-01T12:00:00+00:00",
+            "2024-01-01T03:00:00+00:00",
+        ])
+
+    def test_running_mean_and_stdev(self):
+        import statistics
+        ring = MetricRing(4)
+        values = [5.0, 1.0, 7.5, 2.0, 9.0, 4.0, 3.5]
+        for i, value in enumerate(values):
+            ring.push(value, i)
+            live = values[max(0, i - 3):i + 1]
+            self.assertAlmostEqual(ring.mean(), statistics.mean(live))
+            if len(live) > 1:
+                self.assertAlmostEqual(ring.stdev(), statistics.stdev(live))
+
+    def test_unordered_values_and_latest_after_wrap(self):
+        ring = MetricRing(3)
+        self.assertEqual(ring.latest(), 0.0)
+        for i in range(5):
+            ring.push(float(i), float(i))
+        self.assertEqual(sorted(ring.unordered_values()), [2.0, 3.0, 4.0])
+        self.assertEqual(ring.latest(), 4.0)
+
+    def test_summary_latest_uses_newest_sample_after_wrap(self):
+        pm = PerformanceMonitor({"history_size": 3})
+        for i, value in enumerate([7.0, 1.0, 5.0, 2.0]):
+            pm.metrics_history["cpu"].push(value, float(i))
+        summary = pm._build_history_summary_locked()["cpu"]
+        self.assertEqual(summary.latest, 2.0)
+        self.assertEqual((summary.min, summary.max, summary.median), (1.0, 5.0, 2.0))
+
+    def test_partial_fill(self):
+        ring = MetricRing(4)
+        ring.append({"timestamp": 60.0, "value": 1})
+        self.assertEqual(list(ring.values()), [1.0])
+        self.assertEqual(ring.recent(5), [{"timestamp": _iso(60), "value": 1.0}])
+        ring.clear()
+        self.assertEqual(len(ring), 0)
+
+    def test_anomaly_report_on_full_history(self):
+        pm = PerformanceMonitor({"history_size": 20})
+        for i in range(19):
+            pm.metrics_history["cpu"].push(10.0 + (i % 2), float(i))
+        pm.metrics_history["cpu"].push(95.0, 100.0)
+        anomalies = pm.get_performance_report()["anomalies"]
+        self.assertEqual(anomalies["cpu"][-1]["timestamp"], _iso(100))
+        self.assertEqual(anomalies["cpu"][-1]["severity"], "high")
+
+
+class TestSlope(unittest.TestCase):
+    def test_index_slope_matches_general_regression(self):
+        pm = PerformanceMonitor()
+        y = [3.0, 5.5, 4.0, 9.0, 12.5, 11.0]
+        expected = pm._calculate_slope(list(range(len(y))), y)
+        self.assertAlmostEqual(pm._calculate_index_slope(y), expected)
+
+    def test_index_slope_short_input(self):
+        self.assertEqual(PerformanceMonitor._calculate_index_slope([1.0]), 0.0)
+
 
 class TestCloudResourceInfo(unittest.TestCase):
     """CloudResourceInfo dataclass must include bandwidth_mbps field."""
@@ -174,6 +309,209 @@ class TestHybridSystemManagerInitialize(unittest.TestCase):
         mgr = HybridSystemManager()
         asyncio.run(mgr.initialize())
         self.assertGreater(len(mgr.cloud_resources), 0)
+        self.assertIsNotNone(mgr.current_allocation)
+
+    def test_workload_analysis_does_not_sleep(self):
+        import time
+        from performance_monitor import HybridSystemManager
+        mgr = HybridSystemManager()
+        started = time.monotonic()
+        workload = asyncio.run(mgr._analyze_current_workload())
+        self.assertLess(time.monotonic() - started, 0.9)
+        self.assertIn("cpu_demand", workload)
+
+    def test_energy_trend_uses_last_ten_samples(self):
+        from performance_monitor import EnergyMetrics, HybridSystemManager
+        mgr = HybridSystemManager()
+
+        def push(score):
+            mgr.energy_history.append(EnergyMetrics(0.0, score, 0.0, 0.0))
+
+        for _ in range(9):
+            push(50.0)
+        self.assertEqual(mgr._calculate_energy_trend(), "insufficient_data")
+        push(50.0)
+        self.assertEqual(mgr._calculate_energy_trend(), "stable")
+        for _ in range(20):
+            push(0.0)
+        push(90.0)
+        self.assertEqual(mgr._calculate_energy_trend(), "improving")
+        push(-90.0)
+        self.assertEqual(mgr._calculate_energy_trend(), "degrading")
+
+
+class TestThresholdSnapshot(unittest.TestCase):
+    def test_update_config_refreshes_threshold_snapshot(self):
+        pm = PerformanceMonitor({"cpu_threshold": 90.0})
+        self.assertTrue(pm.update_config({"cpu_threshold": 10.0}))
+        stats = pm._get_default_stats()
+        stats["cpu"]["percent"] = 50.0
+        result = pm._evaluate_thresholds(stats)
+        self.assertEqual(result["cpu"]["threshold"], 10.0)
+        self.assertTrue(result["cpu"]["exceeded"])
+
+    def test_threshold_table_reads_configured_fields(self):
+        pm = PerformanceMonitor({"disk_io_threshold": 100.0})
+        stats = pm._get_default_stats()
+        stats["disk_io"]["write_kbps"] = 150.0
+        stats["disk_io"]["read_kbps"] = 999.0
+        result = pm._evaluate_thresholds(stats)
+        self.assertEqual(list(result), ["memory", "cpu", "disk_io", "process_memory"])
+        self.assertEqual(result["disk_io"], {"value": 150.0, "threshold": 100.0, "exceeded": True})
+
+    def test_direct_threshold_write_refreshes_snapshot(self):
+        pm = PerformanceMonitor({"cpu_threshold": 90.0})
+        pm.thresholds["cpu"] = 10.0
+        stats = pm._get_default_stats()
+        stats["cpu"]["percent"] = 50.0
+        self.assertTrue(pm._evaluate_thresholds(stats)["cpu"]["exceeded"])
+        pm.thresholds = dict(pm.thresholds, cpu=60.0)
+        self.assertFalse(pm._evaluate_thresholds(stats)["cpu"]["exceeded"])
+        pm.thresholds["cpu"] = 40.0
+        self.assertTrue(pm._evaluate_thresholds(stats)["cpu"]["exceeded"])
+
+    def test_direct_alert_config_write_refreshes_snapshot(self):
+        pm = PerformanceMonitor({"alert_threshold": 3})
+        pm.alert_config["trigger_count"] = 1
+        self.assertEqual(pm._alert_settings.trigger_count, 1)
+        pm.alert_config.update(enabled=False)
+        self.assertFalse(pm._alert_settings.enabled)
+
+    def test_partial_thresholds_disable_missing_metrics(self):
+        pm = PerformanceMonitor()
+        pm.thresholds = {"memory": 50.0}
+        stats = pm._get_default_stats()
+        stats["cpu"]["percent"] = 100.0
+        self.assertEqual(pm._evaluate_thresholds(stats)["cpu"]["threshold"], float("inf"))
+        self.assertFalse(pm._evaluate_thresholds(stats)["cpu"]["exceeded"])
+
+    def test_settings_copy_and_pickle_as_plain_dicts(self):
+        pm = PerformanceMonitor()
+        for settings in (pm.thresholds, pm.alert_config):
+            for copied in (copy.copy(settings), copy.deepcopy(settings), pickle.loads(pickle.dumps(settings))):
+                self.assertIs(type(copied), dict)
+                self.assertEqual(copied, settings)
+
+    def test_update_config_refreshes_snapshot_once(self):
+        pm = PerformanceMonitor()
+        with patch.object(pm, "_refresh_settings_snapshot", wraps=pm._refresh_settings_snapshot) as refresh:
+            self.assertTrue(pm.update_config({
+                "cpu_threshold": 10.0, "memory_threshold": 20.0, "alert_threshold": 2, "alert_cooldown": 1.0,
+            }))
+        self.assertEqual(refresh.call_count, 1)
+        self.assertEqual(pm._thr.cpu, 10.0)
+        self.assertEqual(pm._alert_settings.trigger_count, 2)
+
+
+class TestCheckAlerts(unittest.TestCase):
+    def _stats(self, pm, cpu):
+        stats = pm._get_default_stats()
+        stats["cpu"]["percent"] = cpu
+        return stats
+
+    def test_no_alert_below_threshold(self):
+        pm = PerformanceMonitor({"cpu_threshold": 50.0, "alert_threshold": 1})
+        self.assertEqual(pm._check_alerts(self._stats(pm, 10.0)), [])
+        self.assertEqual(pm._consecutive_alerts["cpu"], 0)
+
+    def test_alert_after_consecutive_exceed(self):
+        pm = PerformanceMonitor({"cpu_threshold": 50.0, "alert_threshold": 2})
+        self.assertEqual(pm._check_alerts(self._stats(pm, 80.0)), [])
+        alerts = pm._check_alerts(self._stats(pm, 80.0))
+        self.assertEqual([a["metric"] for a in alerts], ["cpu"])
+        self.assertEqual(alerts[0]["threshold"], 50.0)
+        # クールダウン中は再通知しない
+        self.assertEqual(pm._check_alerts(self._stats(pm, 80.0)), [])
+
+    def test_cooldown_measured_from_sample_epoch(self):
+        pm = PerformanceMonitor({"cpu_threshold": 50.0, "alert_threshold": 1})
+        first = self._stats(pm, 80.0)
+        self.assertEqual(len(pm._check_alerts(first)), 1)
+        self.assertEqual(pm._last_alert_time, first["epoch"])
+        later = self._stats(pm, 80.0)
+        later["epoch"] = first["epoch"] + pm._alert_settings.cooldown
+        self.assertEqual(len(pm._check_alerts(later)), 1)
+
+
+class TestSendAlert(unittest.TestCase):
+    def test_handler_receives_joined_message(self):
+        import contextlib
+        import io
+        pm = PerformanceMonitor()
+        received = []
+        pm.add_alert_handler(received.append)
+        alerts = [
+            {"metric": "cpu", "value": 95.0, "threshold": 90.0},
+            {"metric": "memory", "value": 85.5, "threshold": 80.0},
+        ]
+        with contextlib.redirect_stdout(io.StringIO()) as out:
+            pm._send_alert(alerts)
+        self.assertEqual(received[0]["message"], "cpu 95.00 > 90.00 / memory 85.50 > 80.00")
+        self.assertIn("cpu 95.00 > 90.00", out.getvalue())
+
+    def test_handler_removed_during_dispatch_does_not_skip_others(self):
+        import contextlib
+        import io
+        pm = PerformanceMonitor()
+        received = []
+
+        def first(info):
+            pm.remove_alert_handler(first)
+            received.append("first")
+
+        pm.add_alert_handler(first)
+        pm.add_alert_handler(lambda info: received.append("second"))
+        self.assertFalse(pm.add_alert_handler(first))
+        with contextlib.redirect_stdout(io.StringIO()):
+            pm._send_alert([{"metric": "cpu", "value": 95.0, "threshold": 90.0}])
+        self.assertEqual(received, ["first", "second"])
+        self.assertEqual(len(pm._alert_handlers), 1)
+
+
+class TestCloneStats(unittest.TestCase):
+    def test_clone_is_independent(self):
+        pm = PerformanceMonitor()
+        stats = pm._get_default_stats()
+        clone = pm._clone_stats(stats)
+        clone["cpu"]["percent"] = 99.0
+        self.assertEqual(stats["cpu"]["percent"], 0.0)
+        self.assertEqual(pm._clone_stats(stats), stats)
+
+
+class TestPrometheusEmit(unittest.TestCase):
+    def test_no_payload_without_handlers(self):
+        pm = PerformanceMonitor()
+        pm._maybe_emit_prometheus(pm._get_default_stats())
+        self.assertIsNone(pm.get_prometheus_payload())
+
+    def test_handler_receives_payload(self):
+        pm = PerformanceMonitor({"prometheus_labels": {"host": "a"}})
+        received = []
+        pm.add_prometheus_handler(received.append)
+        stats = pm._get_default_stats()
+        stats["cpu"]["percent"] = 12.5
+        pm._maybe_emit_prometheus(stats)
+        self.assertEqual(len(received), 1)
+        self.assertIn(b'cocoa_system_cpu_percent{host="a"} 12.500000', received[0])
+        self.assertEqual(pm.get_prometheus_payload(), received[0])
+
+
+class TestStreamingShutdown(unittest.TestCase):
+    """stop_streaming() must wake the stream loop instead of waiting out its sleep."""
+
+    def test_stop_streaming_is_prompt(self):
+        import time
+        pm = PerformanceMonitor()
+        pm.running = True  # ストリームループは監視中のみ動作する
+        try:
+            self.assertTrue(pm.start_streaming(interval=30.0))
+            thread = pm._stream_thread
+            started = time.monotonic()
+            self.assertTrue(pm.stop_streaming())
+            self.assertLess(time.monotonic() - started, 1.0)
+            self.assertFalse(thread.is_alive())
+        finally:
+            pm.running = False
 
 
 if __name__ == "__main__":
@@ -1,13 +1,16 @@
 """Tests for PresetChangeHistory — print_history, rollback, timezone correctness."""
 import io
+import json
+import math
 import os
 import sys
 import tempfile
+import threading
 import time
 import unittest
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'main'))
-from preset_change_history import PresetChangeHistory
+from preset_change_history import PresetChangeHistory, _format_utc
 
 
 class TestPrintHistory(unittest.TestCase):
@@ -18,6 +21,7 @@ class TestPrintHistory(unittest.TestCase):
         self.hist = PresetChangeHistory(self.tmpfile.name)
 
     def tearDown(self):
+        self.hist.close()
         os.unlink(self.tmpfile.name)
 
     def test_print_history_outputs_entries(self):
@@ -74,6 +78,22 @@ class TestPrintHistory(unittest.TestCase):
             sys.stdout = sys_stdout
         self.assertEqual(buf.getvalue(), "")
 
+    def test_print_history_one_line_per_entry(self):
+        with open(self.tmpfile.name, "w", encoding="utf-8") as f:
+            f.write('{"timestamp": 0, "preset_name": "X", "change_type": "edit", "note": "a"}\n')
+            f.write('{"timestamp": 86399.5, "preset_name": "X", "change_type": "apply"}\n')
+        buf = io.StringIO()
+        sys_stdout = sys.stdout
+        sys.stdout = buf
+        try:
+            self.hist.print_history("X")
+        finally:
+            sys.stdout = sys_stdout
+        self.assertEqual(buf.getvalue(), (
+            "[1970-01-01 00:00:00] X edit: a\n"
+            "[1970-01-01 23:59:59] X apply: None\n"
+        ))
+
 
 class TestRollback(unittest.TestCase):
 
@@ -83,6 +103,7 @@ class TestRollback(unittest.TestCase):
         self.hist = PresetChangeHistory(self.tmpfile.name)
 
     def tearDown(self):
+        self.hist.close()
         os.unlink(self.tmpfile.name)
 
     def test_rollback_returns_target_state(self):
@@ -117,6 +138,7 @@ class TestTimezoneAwareness(unittest.TestCase):
         self.hist = PresetChangeHistory(self.tmpfile.name)
 
     def tearDown(self):
+        self.hist.close()
         os.unlink(self.tmpfile.name)
 
     def test_fromtimestamp_does_not_raise(self):
@@ -125,3 +147,275 @@ class TestTimezoneAwareness(unittest.TestCase):
         ts = time.time()
         dt = datetime.fromtimestamp(ts, tz=timezone.utc)
         self.assertIsNotNone(dt.tzinfo)
+
+    def test_format_utc_matches_datetime(self):
+        from datetime import datetime, timezone
+        for ts in (0, 59.9999996, 86399.5, 86399.9999996, -0.5, -86400.0000004,
+                   1704067200.123, 2 ** 31 + 0.75, 951782400, 4102444799.9999994):
+            expected = datetime.fromtimestamp(ts, tz=timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+            self.assertEqual(_format_utc(ts), expected, ts)
+
+
+class TestIterHistory(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpfile = tempfile.NamedTemporaryFile(suffix='.jsonl', delete=False)
+        self.tmpfile.close()
+        self.hist = PresetChangeHistory(self.tmpfile.name)
+
+    def tearDown(self):
+        self.hist.close()
+        os.unlink(self.tmpfile.name)
+
+    def test_filter_skips_other_presets_and_broken_lines(self):
+        self.hist.record_change("A", "edit", {}, {"v": 1})
+        self.hist.record_change("AB", "edit", {}, {"v": 2})
+        with open(self.tmpfile.name, "a", encoding="utf-8") as f:
+            f.write('{"preset_name": "A", broken\n\n')
+        self.hist.record_change("A", "edit", {"v": 1}, {"v": 3})
+        self.assertEqual([e["after"]["v"] for e in self.hist.iter_history("A")], [1, 3])
+        self.assertEqual(self.hist.count(), 3)
+
+    def test_filter_matches_lines_from_other_writers(self):
+        with open(self.tmpfile.name, "w", encoding="utf-8") as f:
+            f.write('{"timestamp":1,"preset_name":"A","after":{"v":1}}\n')
+            f.write(json.dumps({"timestamp": 2, "preset_name": "プリセット", "after": {}}) + "\n")
+        self.assertEqual(self.hist.count("A"), 1)
+        self.assertEqual(self.hist.count("プリセット"), 1)
+
+    def test_nan_values_are_still_readable(self):
+        with open(self.tmpfile.name, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"preset_name": "N", "after": {"v": float("nan")}}) + "\n")
+        entries = self.hist.get_history("N")
+        self.assertEqual(len(entries), 1)
+        self.assertNotEqual(entries[0]["after"]["v"], entries[0]["after"]["v"])
+
+    def test_index_rebuilt_when_file_rewritten_larger(self):
+        def write(*lines):
+            with open(self.tmpfile.name, "w", encoding="utf-8") as f:
+                for name, v in lines:
+                    f.write(json.dumps({"preset_name": name, "after": {"v": v}}) + "\n")
+        write(("A", 1), ("B", 2))
+        self.assertEqual([e["after"]["v"] for e in self.hist.iter_history("A")], [1])
+        # 同じ長さの行で書き換え、旧索引の境界が新しい行の境界と一致するようにする
+        write(("A", 3), ("A", 4), ("A", 5))
+        self.assertEqual([e["after"]["v"] for e in self.hist.iter_history("A")], [3, 4, 5])
+        self.assertEqual(self.hist.count("B"), 0)
+
+    def test_read_since_restarts_when_file_rewritten_larger(self):
+        self.hist.record_change("A", "edit", {}, {"v": 1})
+        entries, offset = self.hist.read_since(0)
+        self.assertEqual(len(entries), 1)
+        with open(self.tmpfile.name, "w", encoding="utf-8") as f:
+            for v in (10, 20):
+                f.write(json.dumps({"preset_name": "B", "after": {"v": v}, "pad": "x" * 100}) + "\n")
+        entries, _ = self.hist.read_since(offset)
+        self.assertEqual([e["after"]["v"] for e in entries], [10, 20])
+
+    def test_concurrent_readers_share_index(self):
+        with open(self.tmpfile.name, "w", encoding="utf-8") as f:
+            for i in range(20000):
+                f.write(json.dumps({"preset_name": "A" if i % 2 else "B", "after": {"v": i}}) + "\n")
+        self.hist.INDEX_SAVE_BYTES = 1 << 30
+        barrier = threading.Barrier(8)
+        counts = []
+
+        def read():
+            barrier.wait()
+            counts.append(self.hist.count("A"))
+
+        threads = [threading.Thread(target=read) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(counts, [10000] * 8)
+        self.assertEqual(len(self.hist._offsets["A"]), 10000)
+
+    def test_index_picks_up_appends_and_rewrites(self):
+        self.hist.record_change("A", "edit", {}, {"v": 1})
+        self.assertEqual(self.hist.count("A"), 1)
+        self.hist.record_change("B", "edit", {}, {"v": 2})
+        self.hist.record_change("A", "edit", {}, {"v": 3})
+        self.assertEqual([e["after"]["v"] for e in self.hist.iter_history("A")], [1, 3])
+        with open(self.tmpfile.name, "w", encoding="utf-8") as f:
+            f.write('{"preset_name": "A", "after": {"v": 9}}\n')
+        self.assertEqual([e["after"]["v"] for e in self.hist.iter_history("A")], [9])
+
+    def test_unterminated_last_line_is_read(self):
+        self.hist.record_change("A", "edit", {}, {"v": 1})
+        with open(self.tmpfile.name, "a", encoding="utf-8") as f:
+            f.write('{"preset_name": "A", "after": {"v": 2}}')
+        self.assertEqual([e["after"]["v"] for e in self.hist.iter_history("A")], [1, 2])
+        with open(self.tmpfile.name, "a", encoding="utf-8") as f:
+            f.write('\n')
+        self.assertEqual([e["after"]["v"] for e in self.hist.iter_history("A")], [1, 2])
+
+    def test_latest_state_reads_from_tail(self):
+        self.hist.record_change("A", "edit", {}, {"v": 1})
+        self.hist.record_change("B", "edit", {}, {"v": "x" * 10000})
+        with open(self.tmpfile.name, "a", encoding="utf-8") as f:
+            f.write('{"preset_name": "B", broken\n\n')
+        self.assertEqual(self.hist.latest_state(), {"v": "x" * 10000})
+        self.assertEqual(self.hist.latest_state("A"), {"v": 1})
+        self.hist.record_change("A", "edit", {}, {"v": 2})
+        self.assertEqual(self.hist.latest_state(), {"v": 2})
+        self.assertEqual(self.hist.latest_state("A"), {"v": 2})
+        self.assertIsNone(self.hist.latest_state("C"))
+
+    def test_latest_state_sees_unterminated_last_line(self):
+        self.hist.record_change("A", "edit", {}, {"v": 1})
+        self.assertEqual(self.hist.latest_state("A"), {"v": 1})
+        with open(self.tmpfile.name, "a", encoding="utf-8") as f:
+            f.write('{"preset_name": "A", "after": {"v": 2}}')
+        self.assertEqual(self.hist.latest_state("A"), {"v": 2})
+        self.assertEqual(self.hist.latest_state(), {"v": 2})
+
+    def test_iter_lines_reversed_across_chunks(self):
+        lines = [f"line{i}".encode() for i in range(50)]
+        with open(self.tmpfile.name, "wb") as f:
+            f.write(b"\n".join(lines) + b"\n")
+        got = list(self.hist._iter_lines_reversed(chunk_size=7))
+        self.assertEqual([l for l in got if l], lines[::-1])
+
+
+class TestAppendHandle(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "history.jsonl")
+        self.hist = PresetChangeHistory(self.path)
+
+    def tearDown(self):
+        self.hist.close()
+        self.tmpdir.cleanup()
+
+    def test_handle_is_reused_between_records(self):
+        self.hist.record_change("A", "edit", {}, {"v": 1})
+        handle = self.hist._fh
+        self.hist.record_change("A", "edit", {}, {"v": 2})
+        self.assertIs(self.hist._fh, handle)
+        self.assertEqual(self.hist.count("A"), 2)
+
+    def test_reopens_when_file_is_removed(self):
+        self.hist.record_change("A", "edit", {}, {"v": 1})
+        os.unlink(self.path)
+        self.hist.record_change("A", "edit", {}, {"v": 2})
+        self.assertEqual([e["after"]["v"] for e in self.hist.iter_history("A")], [2])
+
+    def test_close_and_context_manager(self):
+        with PresetChangeHistory(self.path) as hist:
+            hist.record_change("A", "apply", {}, {"v": 1})
+            self.assertIsNotNone(hist._fh)
+        self.assertIsNone(hist._fh)
+        self.assertEqual(self.hist.count("A"), 1)
+
+    def test_record_change_round_trips_values(self):
+        self.hist.record_change("R", "edit", {1: "int key"}, {"name": "日本語", "big": 2 ** 70}, user="u")
+        entry = self.hist.get_history("R")[0]
+        self.assertEqual(entry["before"], {"1": "int key"})
+        self.assertEqual(entry["after"], {"name": "日本語", "big": 2 ** 70})
+        self.assertEqual(entry["user"], "u")
+        with open(self.path, "rb") as f:
+            self.assertIn("日本語".encode("utf-8"), f.read())
+
+    def test_record_change_round_trips_non_finite_floats(self):
+        self.hist.record_change("R", "edit", {"v": float("nan")}, {"v": [float("inf"), -float("inf")]})
+        entry = self.hist.get_history("R")[0]
+        self.assertTrue(math.isnan(entry["before"]["v"]))
+        self.assertEqual(entry["after"]["v"], [float("inf"), -float("inf")])
+        self.assertEqual(self.hist.latest_state("R"), {"v": [float("inf"), -float("inf")]})
+
+
+class TestIndexSidecar(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "history.jsonl")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _history(self):
+        hist = PresetChangeHistory(self.path)
+        hist.INDEX_SAVE_BYTES = 1
+        self.addCleanup(hist.close)
+        return hist
+
+    def test_index_is_saved_and_reused_by_new_instance(self):
+        writer = self._history()
+        for i in range(5):
+            writer.record_change("A" if i % 2 else "B", "edit", {}, {"v": i})
+        self.assertEqual(writer.count("A"), 2)
+        self.assertTrue(os.path.exists(writer.index_file))
+
+        writer.record_change("A", "edit", {}, {"v": 5})
+        reader = self._history()
+        reader.INDEX_SAVE_BYTES = 1 << 30
+        saved = writer._saved_size
+        reader._refresh_offsets()
+        self.assertEqual(reader._saved_size, saved)
+        self.assertEqual([e["after"]["v"] for e in reader.iter_history("A")], [1, 3, 5])
+        self.assertEqual([e["after"]["v"] for e in reader.iter_history("B")], [0, 2, 4])
+
+    def test_stale_index_for_rewritten_file_is_ignored(self):
+        writer = self._history()
+        writer.record_change("A", "edit", {}, {"v": 1})
+        writer.record_change("B", "edit", {}, {"v": 2})
+        writer.count("A")
+        writer.close()
+        with open(self.path, "r+b") as f:
+            data = f.read().replace(b'"A"', b'"C"').replace(b'"B"', b'"A"')
+            f.seek(0)
+            f.write(data)
+        reader = self._history()
+        self.assertEqual([e["after"]["v"] for e in reader.iter_history("A")], [2])
+        self.assertEqual([e["after"]["v"] for e in reader.iter_history("C")], [1])
+
+    def test_loaded_index_notices_later_rewrite(self):
+        def write(*lines):
+            with open(self.path, "w", encoding="utf-8") as f:
+                for name, v in lines:
+                    f.write(json.dumps({"preset_name": name, "after": {"v": v}}) + "\n")
+        write(("A", 1), ("B", 2))
+        self.assertEqual(self._history().count("A"), 1)
+        reader = self._history()
+        self.assertEqual([e["after"]["v"] for e in reader.iter_history("A")], [1])
+        self.assertEqual(reader._saved_size, os.path.getsize(self.path))
+        write(("A", 3), ("A", 4), ("A", 5))
+        self.assertEqual([e["after"]["v"] for e in reader.iter_history("A")], [3, 4, 5])
+
+    def test_broken_index_file_is_ignored(self):
+        writer = self._history()
+        writer.record_change("A", "edit", {}, {"v": 1})
+        with open(writer.index_file, "w", encoding="utf-8") as f:
+            f.write("[1, 2")
+        reader = self._history()
+        self.assertEqual(reader.count("A"), 1)
+
+    def test_index_with_invalid_offsets_is_rebuilt(self):
+        writer = self._history()
+        writer.record_change("A", "edit", {}, {"v": 1})
+        writer.record_change("A", "edit", {}, {"v": 2})
+        size = os.path.getsize(self.path)
+        for offsets in ({"A": ["oops"]}, {"A": [0, 0]}, {"A": [size]}, {"A": 0}):
+            with open(writer.index_file, "w", encoding="utf-8") as f:
+                json.dump({"size": size, "anchor": writer._index_anchor(size), "offsets": offsets}, f)
+            reader = self._history()
+            self.assertEqual([e["after"]["v"] for e in reader.iter_history("A")], [1, 2])
+
+    def test_duplicated_offsets_are_not_saved(self):
+        writer = self._history()
+        writer.record_change("A", "edit", {}, {"v": 1})
+        writer.count("A")
+        os.unlink(writer.index_file)
+        writer._offsets = {"A": [0, 0]}
+        writer._save_index()
+        self.assertFalse(os.path.exists(writer.index_file))
+
+    def test_small_history_does_not_write_index(self):
+        hist = PresetChangeHistory(self.path)
+        self.addCleanup(hist.close)
+        hist.record_change("A", "edit", {}, {"v": 1})
+        self.assertEqual(hist.count("A"), 1)
+        self.assertFalse(os.path.exists(hist.index_file))
@@ -65,6 +65,25 @@ class TestJsonLines(unittest.TestCase):
         combined = "\n".join(lines)
         self.assertLess(combined.index('"a"'), combined.index('"z"'))
 
+    def test_matches_stdlib_layout(self):
+        payload = {"b": [1, {"c": "日本語"}], "a": {}, "n": None, "f": 1.5}
+        for sort_keys in (False, True):
+            expected = json.dumps(payload, ensure_ascii=False, indent=2, sort_keys=sort_keys).splitlines()
+            self.assertEqual(_json_lines(payload, sort_keys=sort_keys), expected)
+
+    def test_matches_stdlib_for_floats_orjson_formats_differently(self):
+        payloads = [
+            {"big": 1e20, "small": 1e-05, "neg": -2.5e-300},
+            {"nan": float("nan"), "inf": float("inf"), "ninf": float("-inf")},
+            {"nested": [{"v": [1.0, 1e16]}], "ok": 0.0001},
+            {1: "int key", 2: "x"},
+            {"tuple": (1, 2.5), "bool": True},
+        ]
+        for payload in payloads:
+            for sort_keys in (False, True):
+                expected = json.dumps(payload, ensure_ascii=False, indent=2, sort_keys=sort_keys).splitlines()
+                self.assertEqual(_json_lines(payload, sort_keys=sort_keys), expected)
+
 
 class TestLoadPreset(unittest.TestCase):
     def test_load_valid_json(self):
@@ -78,6 +97,17 @@ class TestLoadPreset(unittest.TestCase):
         finally:
             os.unlink(fname)
 
+    def test_load_accepts_nan_literal(self):
+        with tempfile.NamedTemporaryFile(mode="w", suffix=".json", delete=False) as f:
+            f.write('{"v": NaN, "name": "日本語"}')
+            fname = f.name
+        try:
+            result = load_preset(fname)
+            self.assertNotEqual(result["v"], result["v"])
+            self.assertEqual(result["name"], "日本語")
+        finally:
+            os.unlink(fname)
+
     def test_file_not_found(self):
         with self.assertRaises(FileNotFoundError):
             load_preset("/nonexistent/path/preset.json")
@@ -24,6 +24,7 @@ class TestPresetHistory(unittest.TestCase):
         self.hist = PresetChangeHistory(self.path)
 
     def tearDown(self):
+        self.hist.close()
         self._tmp.cleanup()
 
     def _seed(self):
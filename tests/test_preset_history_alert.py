@@ -7,17 +7,21 @@ The pure anomaly-detection logic (evaluate_entry) was extracted from the
 I/O-bound monitor loop specifically to make it testable.
 """
 import sys
+import tempfile
 import unittest
 from pathlib import Path
+from unittest.mock import patch
 
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 for p in (str(PROJECT_ROOT), str(PROJECT_ROOT / "main")):
     if p not in sys.path:
         sys.path.insert(0, p)
 
+from preset_change_history import PresetChangeHistory
 from preset_history_alert import (
     _format_timestamp,
     evaluate_entry,
+    poll_history,
     send_slack_alert,
 )
 
@@ -94,5 +98,51 @@ class TestSendSlackAlert(unittest.TestCase):
         self.assertIsInstance(result, bool)
 
 
+class TestPollHistory(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = str(Path(self._tmp.name) / "hist.jsonl")
+        self.hist = PresetChangeHistory(self.path)
+
+    def tearDown(self):
+        self.hist.close()
+        self._tmp.cleanup()
+
+    def test_only_new_entries_are_alerted(self):
+        sent = []
+        with patch("preset_history_alert.send_slack_alert", lambda url, msg: sent.append(msg)):
+            self.assertEqual(poll_history(self.hist, "url", 0), 0)
+            self.hist.record_change("A", "rollback", {}, {}, note="first")
+            offset = poll_history(self.hist, "url", 0)
+            self.assertEqual(len(sent), 1)
+            self.assertEqual(poll_history(self.hist, "url", offset), offset)
+            self.hist.record_change("A", "edit", {}, {})
+            self.hist.record_change("B", "rollback", {}, {}, note="second")
+            poll_history(self.hist, "url", offset)
+        self.assertEqual(len(sent), 2)
+        self.assertIn("second", sent[1])
+
+    def test_partial_line_waits_for_newline(self):
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write('{"preset_name": "A", "change_type": "rollback"}')
+        entries, offset = self.hist.read_since(0)
+        self.assertEqual((entries, offset), ([], 0))
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("\n")
+        entries, offset = self.hist.read_since(0)
+        self.assertEqual(len(entries), 1)
+        self.assertEqual(self.hist.read_since(offset), ([], offset))
+
+    def test_truncated_file_is_reread(self):
+        self.hist.record_change("A", "edit", {}, {})
+        self.hist.record_change("A", "edit", {}, {})
+        _, offset = self.hist.read_since(0)
+        self.hist.close()
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write('{"preset_name": "B"}\n')
+        entries, _ = self.hist.read_since(offset)
+        self.assertEqual([e["preset_name"] for e in entries], ["B"])
+
+
 if __name__ == "__main__":
     unittest.main(verbosity=2)
@@ -73,6 +73,11 @@ class TestModuleConstants(unittest.TestCase):
         self.assertIn("<html>", dashboard.TEMPLATE)
         self.assertIn("</html>", dashboard.TEMPLATE)
 
+    def test_template_compiled_once_at_import(self):
+        from_string = dashboard.app.jinja_env.from_string
+        from_string.assert_any_call(dashboard.TEMPLATE)
+        self.assertIs(dashboard.DASHBOARD_TEMPLATE, from_string.return_value)
+
 
 if __name__ == "__main__":
     unittest.main()
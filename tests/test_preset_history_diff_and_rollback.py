@@ -2,10 +2,11 @@
 import os
 import sys
 import unittest
+from datetime import datetime
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "main"))
 
-from preset_history_diff_and_rollback import diff_dict, find_entry_by_time
+from preset_history_diff_and_rollback import build_time_index, diff_dict, find_entry_by_time
 
 
 class TestDiffDict(unittest.TestCase):
@@ -98,6 +99,16 @@ class TestDiffDict(unittest.TestCase):
         diffs = diff_dict({"x": None}, {"x": None})
         self.assertEqual(diffs, [], "same explicit None on both sides is not a diff")
 
+    def test_output_sorted_across_missing_and_nested_keys(self):
+        d1 = {"c": 1, "b": {"y": 1, "x": 1}, "a": 1}
+        d2 = {"b": {"x": 2, "y": 2}, "d": 4, "a": 1}
+        self.assertEqual(diff_dict(d1, d2), [
+            "b.x: 1 -> 2",
+            "b.y: 1 -> 2",
+            "c: 1 -> <missing>",
+            "d: <missing> -> 4",
+        ])
+
 
 class TestFindEntryByTime(unittest.TestCase):
 
@@ -108,7 +119,6 @@ class TestFindEntryByTime(unittest.TestCase):
         self.assertIsNone(find_entry_by_time([], "2024-01-01 00:00:00"))
 
     def test_exact_match(self):
-        from datetime import datetime
         ts_str = "2024-06-15 12:00:00"
         unix_ts = datetime.strptime(ts_str, "%Y-%m-%d %H:%M:%S").timestamp()
         entries = [self._make_entry(unix_ts, {"v": 1})]
@@ -117,7 +127,6 @@ class TestFindEntryByTime(unittest.TestCase):
         self.assertEqual(result["after"]["v"], 1)
 
     def test_closest_entry_returned(self):
-        from datetime import datetime
         base = datetime.strptime("2024-01-01 12:00:00", "%Y-%m-%d %H:%M:%S").timestamp()
         entries = [
             self._make_entry(base - 3600, {"label": "early"}),
@@ -128,7 +137,6 @@ class TestFindEntryByTime(unittest.TestCase):
         self.assertEqual(result["after"]["label"], "close")
 
     def test_entries_without_timestamp_skipped(self):
-        from datetime import datetime
         ts_str = "2024-01-01 00:00:00"
         unix_ts = datetime.strptime(ts_str, "%Y-%m-%d %H:%M:%S").timestamp()
         entries = [
@@ -149,13 +157,68 @@ class TestFindEntryByTime(unittest.TestCase):
         self.assertEqual(result["after"]["v"], "only")
 
     def test_float_timestamp_accepted(self):
-        from datetime import datetime
         ts_str = "2024-03-15 08:30:00"
         unix_ts = float(datetime.strptime(ts_str, "%Y-%m-%d %H:%M:%S").timestamp())
         entries = [self._make_entry(unix_ts, {"data": "float_ts"})]
         result = find_entry_by_time(entries, ts_str)
         self.assertIsNotNone(result)
 
+    def test_unsorted_entries_closest_returned(self):
+        base = datetime.strptime("2024-01-01 12:00:00", "%Y-%m-%d %H:%M:%S").timestamp()
+        entries = [
+            self._make_entry(base + 7200, {"label": "late"}),
+            self._make_entry(base - 30, {"label": "close"}),
+            self._make_entry(base - 3600, {"label": "early"}),
+        ]
+        result = find_entry_by_time(entries, "2024-01-01 12:00:00")
+        self.assertEqual(result["after"]["label"], "close")
+
+    def test_target_after_last_entry_returns_last(self):
+        entries = [self._make_entry(float(t), {"v": t}) for t in (10, 20, 30)]
+        result = find_entry_by_time(entries, "2099-01-01 00:00:00")
+        self.assertEqual(result["after"]["v"], 30)
+
+    def test_equal_distance_prefers_earlier_entry(self):
+        base = datetime.strptime("2024-01-01 12:00:00", "%Y-%m-%d %H:%M:%S").timestamp()
+        entries = [
+            self._make_entry(base - 60, {"label": "before"}),
+            self._make_entry(base + 60, {"label": "after"}),
+        ]
+        result = find_entry_by_time(entries, "2024-01-01 12:00:00")
+        self.assertEqual(result["after"]["label"], "before")
+
+    def test_same_timestamp_returns_first_in_file_order(self):
+        entries = [
+            self._make_entry(100.0, {"label": "first"}),
+            self._make_entry(100.0, {"label": "second"}),
+        ]
+        result = find_entry_by_time(entries, "2024-01-01 00:00:00")
+        self.assertEqual(result["after"]["label"], "first")
+
+    def test_prebuilt_index_reused(self):
+        base = datetime.strptime("2024-01-01 12:00:00", "%Y-%m-%d %H:%M:%S").timestamp()
+        entries = [self._make_entry(base + h * 3600, {"h": h}) for h in range(5)]
+        index = build_time_index(entries)
+        first = find_entry_by_time(entries, "2024-01-01 12:10:00", index)
+        last = find_entry_by_time(entries, "2024-01-01 15:50:00", index)
+        self.assertEqual(first["after"]["h"], 0)
+        self.assertEqual(last["after"]["h"], 4)
+
+    def test_build_time_index_skips_untimed_entries(self):
+        entries = [{"after": {}}, self._make_entry(2.0, {}), self._make_entry(1.0, {})]
+        timestamps, timed = build_time_index(entries)
+        self.assertEqual(timestamps, [1.0, 2.0])
+        self.assertEqual(len(timed), 2)
+
+    def test_small_and_large_inputs_agree(self):
+        base = datetime.strptime("2024-01-01 12:00:00", "%Y-%m-%d %H:%M:%S").timestamp()
+        for n in (5, 100):
+            entries = [self._make_entry(base + (i * 37 % n) * 60, {"i": i}) for i in range(n)]
+            for minute in (-5, 0, 2, n + 3):
+                ts = datetime.fromtimestamp(base + minute * 60).strftime("%Y-%m-%d %H:%M:%S")
+                expected = find_entry_by_time(entries, ts, build_time_index(entries))
+                self.assertIs(find_entry_by_time(entries, ts), expected)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,9 +1,11 @@
 """Tests for preset_manager module."""
 import logging
+import math
 import os
 import sys
 import tempfile
 import unittest
+from unittest import mock
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'main'))
 
@@ -155,6 +157,83 @@ class TestPresetManagerSearch(unittest.TestCase):
             results = mgr.search_presets("")
             self.assertGreaterEqual(len(results), 2)
 
+    def test_search_is_case_insensitive(self):
+        with tempfile.TemporaryDirectory() as d:
+            mgr = make_manager(d)
+            mgr.save_preset("Hero", {"parameters": {"EyeColor": 1}, "tags": ["Anime"]})
+            self.assertEqual(mgr.search_presets("hero"), ["Hero"])
+            self.assertEqual(mgr.search_presets("EYECOLOR"), ["Hero"])
+            self.assertEqual(mgr.search_presets("anime"), ["Hero"])
+
+    def test_search_sees_changes_after_cached_query(self):
+        with tempfile.TemporaryDirectory() as d:
+            mgr = make_manager(d)
+            mgr.save_preset("p1", {"tags": ["alpha"]})
+            self.assertEqual(mgr.search_presets("beta"), [])
+            mgr.save_preset("p2", {"tags": ["beta"]})
+            self.assertEqual(mgr.search_presets("beta"), ["p2"])
+            mgr.delete_preset("p2")
+            self.assertEqual(mgr.search_presets("beta"), [])
+
+    def test_repeated_search_reuses_result(self):
+        with tempfile.TemporaryDirectory() as d:
+            mgr = make_manager(d)
+            mgr.save_preset("p1", {"tags": ["alpha"]})
+            first = mgr.search_presets("ALPHA")
+            first.append("mutated")
+            mgr._search_entries = []  # 走査されれば空結果になる
+            self.assertEqual(mgr.search_presets("alpha"), ["p1"])
+
+    def test_search_result_cache_is_bounded(self):
+        with tempfile.TemporaryDirectory() as d:
+            mgr = make_manager(d)
+            mgr.save_preset("p1", {"tags": ["alpha"]})
+            for i in range(mgr.SEARCH_RESULT_CACHE_SIZE + 10):
+                mgr.search_presets(f"q{i}")
+            self.assertLessEqual(len(mgr._search_results), mgr.SEARCH_RESULT_CACHE_SIZE)
+
+    def test_load_round_trips_saved_presets(self):
+        with tempfile.TemporaryDirectory() as d:
+            mgr = make_manager(d)
+            mgr.save_preset("p1", {"名前": "値", "tags": ["anime"], "scale": 0.1})
+            with open(os.path.join(d, "p2.json"), "w", encoding="utf-8") as f:
+                f.write('{"v": NaN}')
+            fresh = make_manager(d)
+            fresh.load_presets()
+            self.assertEqual(fresh.get_preset("p1"), {"名前": "値", "tags": ["anime"], "scale": 0.1})
+            self.assertTrue(math.isnan(fresh.get_preset("p2")["v"]))
+
+    def test_reload_skips_unchanged_files(self):
+        with tempfile.TemporaryDirectory() as d:
+            mgr = make_manager(d)
+            mgr.save_preset("p1", {"tags": ["a"]})
+            with open(os.path.join(d, "p2.json"), "w", encoding="utf-8") as f:
+                f.write('{"tags": ["b"]}')
+            with mock.patch.object(mgr, "_load_preset", wraps=mgr._load_preset) as load:
+                mgr.load_presets()
+                self.assertEqual([c.args[0].name for c in load.call_args_list], ["p2.json"])
+                load.reset_mock()
+                mgr.load_presets()
+                load.assert_not_called()
+            self.assertEqual(sorted(mgr.presets), ["p1", "p2"])
+
+    def test_reload_picks_up_modified_and_removed_files(self):
+        with tempfile.TemporaryDirectory() as d:
+            mgr = make_manager(d)
+            mgr.save_preset("p1", {"tags": ["old"]})
+            mgr.save_preset("p2", {"tags": ["gone"]})
+            mgr.load_presets()
+            path = os.path.join(d, "p1.json")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write('{"tags": ["new", "extra"]}')
+            os.unlink(os.path.join(d, "p2.json"))
+            mgr.load_presets()
+            self.assertEqual(mgr.get_preset("p1"), {"tags": ["new", "extra"]})
+            self.assertIsNone(mgr.get_preset("p2"))
+            self.assertEqual(mgr.search_presets("old"), [])
+            self.assertEqual(mgr.search_presets("gone"), [])
+            self.assertEqual(mgr.search_presets("new"), ["p1"])
+
 
 class TestPresetManagerCompare(unittest.TestCase):
     def test_compare_identical(self):
@@ -174,6 +253,28 @@ class TestPresetManagerCompare(unittest.TestCase):
             diff = mgr.compare_presets("p1", "p2")
             self.assertIsInstance(diff, dict)
 
+    def test_compare_result_does_not_alias_cache(self):
+        with tempfile.TemporaryDirectory() as d:
+            mgr = make_manager(d)
+            mgr.save_preset("p1", {"parameters": [1]})
+            mgr.save_preset("p2", {"parameters": [2]})
+            diff = mgr.compare_presets("p1", "p2")
+            diff["differences"]["parameters"]["preset1"].append("mutated")
+            self.assertEqual(mgr.get_preset("p1")["parameters"], [1])
+
+    def test_merge_prefers_update_and_does_not_alias_cache(self):
+        with tempfile.TemporaryDirectory() as d:
+            mgr = make_manager(d)
+            mgr.save_preset("base", {"a": 1, "parameters": [1]})
+            mgr.save_preset("upd", {"a": 2, "extra": {"k": "v"}})
+            merged = mgr.merge_presets("base", "upd")
+            self.assertEqual(merged["a"], 2)
+            self.assertEqual(merged["parameters"], [1])
+            merged["parameters"].append("mutated")
+            merged["extra"]["k"] = "changed"
+            self.assertEqual(mgr.get_preset("base")["parameters"], [1])
+            self.assertEqual(mgr.get_preset("upd")["extra"], {"k": "v"})
+
 
 class TestBatchOperations(unittest.TestCase):
     def test_batch_update(self):
@@ -88,6 +88,16 @@ class TestBackupFile(unittest.TestCase):
             name = Path(backup_path).name
             self.assertRegex(name, r"\d{8}_\d{6}")
 
+    def test_backup_keeps_content_and_mtime(self):
+        import os
+        with tempfile.TemporaryDirectory() as td:
+            src = Path(td) / "preset.json"
+            src.write_text('{"name": "x"}', encoding="utf-8")
+            os.utime(src, ns=(1_000_000_000_000_000_000, 1_500_000_000_123_456_789))
+            backup_path = Path(backup_file(str(src), str(Path(td) / "bak")))
+            self.assertEqual(backup_path.read_text(encoding="utf-8"), '{"name": "x"}')
+            self.assertEqual(backup_path.stat().st_mtime_ns, src.stat().st_mtime_ns)
+
 
 class TestValidateAndRepairDir(unittest.TestCase):
     def test_empty_dir_returns_empty_list(self):
@@ -140,6 +150,48 @@ class TestValidateAndRepairDir(unittest.TestCase):
                 report = json.load(f)
             self.assertIsInstance(report, list)
 
+    def test_many_files_reported_in_listing_order(self):
+        with tempfile.TemporaryDirectory() as td:
+            for i in range(20):
+                body = '{"parameters": []}' if i % 2 else '{"name": "n", "parameters": []}'
+                (Path(td) / f"p{i:02d}.json").write_text(body, encoding="utf-8")
+            serial = validate_and_repair_dir(td, backup_dir=str(Path(td) / "bak1"), max_workers=1)
+            for i in range(1, 20, 2):
+                (Path(td) / f"p{i:02d}.json").write_text('{"parameters": []}', encoding="utf-8")
+            parallel = validate_and_repair_dir(td, backup_dir=str(Path(td) / "bak2"), max_workers=4)
+            self.assertEqual([r["file"] for r in parallel], [r["file"] for r in serial])
+            self.assertEqual(sum(r["repaired"] for r in parallel), 10)
+            stamps = {Path(r["backup"]).name.split(".json.")[1] for r in parallel if r["repaired"]}
+            self.assertEqual(len(stamps), 1)
+
+    def test_backup_file_uses_given_timestamp(self):
+        with tempfile.TemporaryDirectory() as td:
+            src = Path(td) / "preset.json"
+            src.write_text("{}", encoding="utf-8")
+            backup_path = backup_file(str(src), str(Path(td) / "bak"), ts="20240101_000000")
+            self.assertEqual(Path(backup_path).name, "preset.json.20240101_000000.bak")
+
+    def test_only_visible_json_files_are_processed(self):
+        with tempfile.TemporaryDirectory() as td:
+            (Path(td) / "a.json").write_text('{"name": "a", "parameters": []}', encoding="utf-8")
+            (Path(td) / ".hidden.json").write_text("{}", encoding="utf-8")
+            (Path(td) / "notes.txt").write_text("x", encoding="utf-8")
+            (Path(td) / "dir.json").mkdir()
+            result = validate_and_repair_dir(td, backup_dir=str(Path(td) / "bak"))
+            self.assertEqual([Path(r["file"]).name for r in result], ["a.json"])
+
+    def test_missing_dir_returns_empty_list(self):
+        with tempfile.TemporaryDirectory() as td:
+            self.assertEqual(validate_and_repair_dir(str(Path(td) / "nope")), [])
+
+    def test_nan_preset_not_reported_as_repaired(self):
+        with tempfile.TemporaryDirectory() as td:
+            p = Path(td) / "nan.json"
+            p.write_text('{"name": "n", "parameters": [], "v": NaN}', encoding="utf-8")
+            result = validate_and_repair_dir(td, backup_dir=str(Path(td) / "bak"))
+            self.assertIsNone(result[0]["error"])
+            self.assertFalse(result[0]["repaired"])
+
 
 class TestPresetPerformanceMonitor(unittest.TestCase):
     def test_constructor_does_not_raise(self):
@@ -175,6 +227,14 @@ class TestPresetPerformanceMonitor(unittest.TestCase):
         pm = PresetPerformanceMonitor()
         pm.end_operation("nonexistent_id")  # should silently return
 
+    def test_duration_uses_monotonic_counter(self):
+        from unittest.mock import patch
+        pm = PresetPerformanceMonitor()
+        with patch("validate_and_repair_presets.time.perf_counter_ns", side_effect=[1_000_000, 6_500_000]):
+            op_id = pm.start_operation("timed")
+            pm.end_operation(op_id)
+        self.assertAlmostEqual(pm.operation_stats[op_id]["duration_ms"], 5.5)
+
     def test_op_history_uses_deque(self):
         pm = PresetPerformanceMonitor()
         op_id = pm.start_operation("check")
@@ -223,6 +283,11 @@ class TestPresetPerformanceMonitor(unittest.TestCase):
         for field in ("count", "avg_ms", "max_ms", "min_ms"):
             self.assertIn(field, summary)
 
+    def test_operation_ids_unique_for_same_start_time(self):
+        pm = PresetPerformanceMonitor()
+        ids = {pm.start_operation("op") for _ in range(100)}
+        self.assertEqual(len(ids), 100)
+
 
 if __name__ == "__main__":
     unittest.main(verbosity=2)